@@ -0,0 +1,254 @@
+# ====================== API PREDIKSI (ASGI) ======================
+# Layanan HTTP ringan untuk sistem lain, memakai bundle model dan encoder yang
+# sama dengan aplikasi Streamlit. Jalankan dengan:
+#   uvicorn api:app --host 0.0.0.0 --port 8000
+#
+#   GET  /health   → status dan versi model aktif
+#   GET  /metrics  → timer dan counter format Prometheus (lihat instrumentation.py)
+#   POST /predict  → satu record (objek JSON) atau banyak record
+#                    (array JSON / {"records": [...]}) dengan kolom used_columns
+#
+# Request yang datang bersamaan digabung (micro-batching) menjadi satu matriks
+# sebelum diprediksi, sehingga biaya per panggilan model dibagi ke banyak request.
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import training
+from encoder import encode_features, encode_record
+from model_store import ModelStore
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_ROWS = 1024
+MAX_WAIT_SECONDS = 0.002
+# Batch kecil di-encode per record (tanpa DataFrame), batch besar sekaligus
+SMALL_REQUEST_ROWS = 32
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def encode_records(records, columns):
+    if len(records) <= SMALL_REQUEST_ROWS:
+        return np.vstack([encode_record(record, columns) for record in records])
+    return encode_features(pd.DataFrame.from_records(records), columns)
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch, max_rows=MAX_BATCH_ROWS, max_wait=MAX_WAIT_SECONDS):
+        self.predict_batch = predict_batch
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, bundle, X):
+        # X di-encode dengan used_columns bundle ini, jadi harus diprediksi dengan bundle yang sama
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((bundle, X, future))
+        return await future
+
+    async def _collect(self):
+        # Tunggu request pertama, lalu kumpulkan request lain selama max_wait
+        items = [await self._queue.get()]
+        n_rows = len(items[0][1])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while n_rows < self.max_rows:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            n_rows += len(item[1])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Request yang di-encode dengan versi berbeda (model baru dipublikasikan
+            # di tengah batch) tidak digabung; tiap versi diprediksi terpisah
+            groups = {}
+            for bundle, x, future in await self._collect():
+                groups.setdefault(bundle.version, (bundle, []))[1].append((x, future))
+
+            for bundle, items in groups.values():
+                X = np.concatenate([x for x, _ in items]) if len(items) > 1 else items[0][0]
+                try:
+                    # Prediksi di thread pool agar event loop tetap melayani request lain
+                    y_pred, proba = await loop.run_in_executor(None, self.predict_batch, bundle, X)
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                start = 0
+                for x, future in items:
+                    stop = start + len(x)
+                    if not future.done():
+                        future.set_result((y_pred[start:stop], proba[start:stop]))
+                    start = stop
+
+
+class PredictionService:
+    def __init__(self, store=None):
+        self.store = store or ModelStore()
+        self.batcher = MicroBatcher(self.predict_batch)
+
+    def predict_batch(self, bundle, X):
+        with instrumentation.profile("api_predict_batch"):
+            result = bundle.predict(X), bundle.predict_proba(X)
+        instrumentation.inc("predictions_total", len(X), source="api")
+        return result
+
+    async def startup(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, training.ensure_bundle, self.store)
+        self.batcher.start()
+
+    async def shutdown(self):
+        await self.batcher.stop()
+
+    def _parse_records(self, body):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise ApiError(400, "Body harus berupa JSON yang valid")
+
+        single = isinstance(payload, dict) and "records" not in payload
+        if single:
+            records = [payload]
+        elif isinstance(payload, dict):
+            records = payload["records"]
+        else:
+            records = payload
+        if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+            raise ApiError(400, "Data harus berupa objek record atau array record yang tidak kosong")
+        return single, records
+
+    async def predict(self, body):
+        single, records = self._parse_records(body)
+        # Bundle ditentukan sekali per request: encode dan prediksi memakai versi yang sama
+        bundle = self.store.current()
+        columns = bundle.used_columns
+        missing = sorted({col for record in records for col in columns if col not in record})
+        if missing:
+            raise ApiError(422, f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+        with instrumentation.timer("encode"):
+            X = encode_records(records, columns)
+        y_pred, proba = await self.batcher.submit(bundle, X)
+        version, classes = bundle.version, bundle.classes_
+        predictions = [
+            {
+                "diagnosis": str(classes[pred]),
+                "probabilities": {str(c): float(p) for c, p in zip(classes, row)},
+            }
+            for pred, row in zip(y_pred, proba)
+        ]
+        if single:
+            return dict(model_version=version, **predictions[0])
+        return {"model_version": version, "predictions": predictions}
+
+    async def handle(self, method, path, body):
+        if path == "/health" and method == "GET":
+            bundle = self.store.current()
+            return 200, {"status": "ok", "model_version": bundle.version if bundle else None}
+        if path == "/metrics" and method == "GET":
+            return 200, instrumentation.render()
+        if path == "/predict":
+            if method != "POST":
+                raise ApiError(405, "Gunakan metode POST")
+            return 200, await self.predict(body)
+        raise ApiError(404, "Endpoint tidak ditemukan")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            body = await _read_body(receive)
+            status, payload = await self.handle(scope["method"], scope["path"], body)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": f"Gagal memproses request: {e}"}
+        if isinstance(payload, str):
+            await _send(send, status, payload.encode("utf-8"), b"text/plain; version=0.0.4; charset=utf-8")
+        else:
+            await _send_json(send, status, payload)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ApiError(413, "Body request terlalu besar")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await _send(send, status, body, b"application/json; charset=utf-8")
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+app = PredictionService()
@@ -1,77 +1,104 @@
-# ====================== BAGIAN TRAINING DAN SIMPAN MODEL ======================
+# ====================== BAGIAN STREAMLIT APP ======================
+import time
+
 import pandas as pd
-from sklearn.svm import SVC
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from imblearn.over_sampling import SMOTE
-import joblib
 import streamlit as st
 
-st.set_page_config(page_title="Deteksi Dini Penyakit Hepatitis", layout="wide")
-
-# 1. Baca dataset
-df = pd.read_excel("Data Training Hepatitis.xlsx")
+import bulk
+import ingest
+import instrumentation
+import jobs
+import training
+from encoder import SYMPTOM_COLUMNS, encode_features, encode_record
+from model_store import ModelStore
+from prediction_cache import PredictionCache
 
-# 2. Encode kolom JK
-df["JK"] = df["JK"].map({"P": 0, "L": 1})
+st.set_page_config(page_title="Deteksi Dini Penyakit Hepatitis", layout="wide")
+render_start = time.perf_counter()
 
-# 3. Konversi Ya/Tidak
-symptom_cols = df.columns.difference(["Umur", "JK", "Kategori Diagnosis"])
-for col in symptom_cols:
-    df[col] = df[col].apply(lambda x: 1 if str(x).strip().lower() == "ya" else 0)
 
-# 4. Label encoding untuk target
-label_encoder = LabelEncoder()
-df["Kategori Diagnosis"] = label_encoder.fit_transform(df["Kategori Diagnosis"])
+# Endpoint /metrics terpisah (HEPATITIS_METRICS_PORT), dijalankan sekali per proses
+@st.cache_resource
+def start_metrics_server():
+    return instrumentation.start_http_server_from_env()
 
-# 5. Pisahkan X dan y
-X = df.drop(columns=["Kategori Diagnosis"]).fillna(0)
-y = df["Kategori Diagnosis"]
 
-# 6. SMOTE (duluan, pakai data mentah)
-smote = SMOTE(random_state=42)
-X_resampled, y_resampled = smote.fit_resample(X, y)
+# Training hanya dijalankan sekali per fingerprint dataset (lihat training.py),
+# dan bundle model dimuat sekali per proses, bukan di setiap rerun.
+@st.cache_resource(show_spinner="Memuat model...")
+def get_model_store():
+    store = ModelStore()
+    training.ensure_bundle(store)
+    return store
 
-# 7. Normalisasi (setelah SMOTE)
-scaler = MinMaxScaler()
-X_resampled_scaled = scaler.fit_transform(X_resampled)
 
-# 8. Latih model SVM
-svm_model = SVC(kernel='linear', probability=True, random_state=42)
-svm_model.fit(X_resampled_scaled, y_resampled)
+# Cache hasil prediksi manual, dibagi semua sesi; dikosongkan saat versi model berganti
+@st.cache_resource
+def get_prediction_cache():
+    cache = PredictionCache()
+    get_model_store().add_listener(cache.invalidate)
+    return cache
 
-# 9. Evaluasi pada data asli
-X_scaled = scaler.transform(X)
-y_pred = svm_model.predict(X_scaled)
 
-print("Akurasi:", accuracy_score(y, y_pred))
-print(classification_report(y, y_pred))
+# Training ulang berjalan di process pool terpisah, dibagi semua sesi
+@st.cache_resource
+def get_job_manager():
+    return jobs.TrainingJobManager(get_model_store())
 
-# 10. Simpan model dan encoder
-joblib.dump(svm_model, "svm_model.pkl")
-joblib.dump(label_encoder, "label_encoder.pkl")
-joblib.dump(scaler, "scaler.pkl")
-joblib.dump(X.columns.tolist(), "used_columns.pkl")
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_training_file(data):
+    # Workbook yang sama hanya di-parse sekali (cache kolomnar, lihat ingest.py)
+    return ingest.load_table(data)
 
-# ====================== BAGIAN STREAMLIT APP ======================
 
-# Load model dan encoder
-svm_model = joblib.load("svm_model.pkl")
-label_encoder = joblib.load("label_encoder.pkl")
-scaler = joblib.load("scaler.pkl")
-used_columns = joblib.load("used_columns.pkl")
+def show_explanation(model_bundle, input_matrix, pred, probas):
+    # Probabilitas per kelas dan kontribusi tiap faktor terhadap kelas prediksi (lihat explain.py)
+    st.markdown("### 📊 Probabilitas per Kategori")
+    st.dataframe(pd.DataFrame({"Kategori Diagnosis": model_bundle.classes_, "Probabilitas": probas})
+                 .sort_values("Probabilitas", ascending=False, ignore_index=True))
+    if model_bundle.explainer is None:
+        st.caption("Kontribusi per faktor hanya tersedia untuk model linear.")
+        return
+    st.markdown("### 🔎 Kontribusi Faktor terhadap Prediksi")
+    st.caption("Positif: mendorong ke kategori hasil prediksi; negatif: menjauhkan (dibanding rata-rata data training).")
+    table = model_bundle.explainer.explain_record(input_matrix, pred)
+    st.bar_chart(table.set_index("Fitur")["Kontribusi"])
+    st.dataframe(table)
 
-# Dummy JK encoder dengan transform manual
-def jk_encode(val):
-    return 1 if val.startswith("L") else 0
 
-model_ready = all([svm_model, label_encoder, scaler, used_columns])
+start_metrics_server()
 
 st.title("🩺 Aplikasi Deteksi Dini Hepatitis")
 
 menu = st.sidebar.selectbox("📋 Menu", ["🏠 Beranda", "📈 Diagnosis", "🧪 Uji Dengan Data Baru"])
 
+# Beranda dirender tanpa memuat model (dan tanpa mengimpor sklearn/imblearn);
+# model baru dimuat saat halaman Diagnosis atau Uji dibuka
+if menu != "🏠 Beranda":
+    # Load model dan encoder dari satu bundle, sehingga model/scaler selalu sepasang
+    model_store = get_model_store()
+    prediction_cache = get_prediction_cache()
+    latest_version = model_store.current().version
+
+    # Setiap sesi dipin ke satu versi model, sehingga hasil tidak berganti di tengah
+    # sesi saat model lain dipublikasikan; pindah ke versi terbaru atas pilihan pengguna
+    pinned_version = st.session_state.get("model_version")
+    if pinned_version is None or not model_store.has_version(pinned_version):
+        pinned_version = st.session_state["model_version"] = latest_version
+    if pinned_version != latest_version:
+        st.sidebar.info(f"Versi model baru tersedia ({latest_version}). Sesi ini masih memakai versi {pinned_version}.")
+        if st.sidebar.button("🔄 Gunakan Versi Terbaru"):
+            st.session_state["model_version"] = latest_version
+            st.rerun()
+    bundle = model_store.get(pinned_version)
+    svm_model = bundle.model
+    label_encoder = bundle.label_encoder
+    scaler = bundle.scaler
+    used_columns = bundle.used_columns
+
+    model_ready = all([svm_model, label_encoder, scaler, used_columns])
+
 if menu == "🏠 Beranda":
     st.markdown("Aplikasi ini membantu Anda mengetahui tingkat risiko seseorang terkena **penyakit hepatitis**, "
                 "berdasarkan berbagai **faktor risiko**")
@@ -92,60 +119,89 @@ elif menu == "📈 Diagnosis":
         if not model_ready:
             st.warning("❗ Model belum tersedia. Silakan latih ulang model terlebih dahulu.")
         else:
-            testing_file = st.file_uploader("Upload File Prediksi Dengan Data Masal (.xlsx)", type=["xlsx"])
-            if testing_file:
+            testing_files = st.file_uploader("Upload File Prediksi Dengan Data Masal (.xlsx, .csv, .parquet)",
+                                             type=bulk.SUPPORTED_TYPES, accept_multiple_files=True)
+            explain_bulk = st.checkbox("Tambahkan kolom probabilitas dan faktor utama per pasien", value=False)
+            if testing_files:
                 try:
-                    # Baca file asli untuk mempertahankan label
-                    df_test_raw = pd.read_excel(testing_file)
-                    df_test = df_test_raw.copy()
-
-                    # Proses kolom JK
-                    df_test["JK"] = df_test["JK"].astype(str).str[0].map({"P": 0, "L": 1})
-
-                    # Proses Ya/Tidak
-                    for col in used_columns:
-                        if col not in ["JK", "Umur"]:
-                            df_test[col] = df_test[col].apply(lambda x: 1 if str(x).strip().lower() == "ya" else 0)
-
-                    # Lengkapi kolom dan isi NaN
-                    df_test = df_test.reindex(columns=used_columns, fill_value=0).fillna(0)
-
-                    # Normalisasi
-                    X_test = scaler.transform(df_test)
+                    # Hasil disimpan per sesi, agar rerun (mis. klik di tab lain) tidak memprediksi ulang
+                    result_key = ("bulk_result", tuple(f.file_id for f in testing_files), bundle.version,
+                                  explain_bulk)
+                    if st.session_state.get("bulk_result_key") != result_key:
+                        # Baca, encode dan prediksi per chunk; file tidak pernah dimuat utuh.
+                        # Semua file diakumulasi ke satu hasil (prediksi dan evaluasi gabungan).
+                        progress = st.progress(0.0, text="Memproses data...")
+                        result = None
+                        for i, testing_file in enumerate(testing_files):
+                            total_rows, chunks = bulk.open_chunks(testing_file, testing_file.name)
+                            done_rows = result.n_rows if result is not None else 0
+
+                            def update_progress(n_rows):
+                                file_rows = n_rows - done_rows
+                                fraction = min(file_rows / total_rows, 1.0) if total_rows else 0.0
+                                progress.progress((i + fraction) / len(testing_files),
+                                                  text=f"Memproses {testing_file.name}... {n_rows:,} baris")
+
+                            with instrumentation.profile("diagnosis_bulk"):
+                                result = bulk.score_chunks(bundle, chunks, update_progress, result=result,
+                                                           source=testing_file.name, explain=explain_bulk)
+                        st.session_state["bulk_result"] = result
+                        st.session_state["bulk_result_key"] = result_key
+                        progress.empty()
+                    result = st.session_state["bulk_result"]
 
                     # ======== Jika ada label (Kategori Diagnosis) ========
-                    if "Kategori Diagnosis" in df_test_raw.columns:
-                        y_true = label_encoder.transform(df_test_raw["Kategori Diagnosis"])
-                        y_pred = svm_model.predict(X_test)
-
+                    if result.labelled:
+                        evaluation = result.evaluation
                         # Akurasi
-                        acc = accuracy_score(y_true, y_pred) * 100
+                        acc = result.accuracy * 100 if result.accuracy is not None else 0.0
                         st.success(f"🎯 Akurasi Model SVM: {acc:.2f}%")
+                        st.caption(f"Versi model: {bundle.version}")
                         st.markdown(
-                            f"**Total data:** {len(y_true)} | "
-                            f"**Benar:** {(y_true == y_pred).sum()} | "
-                            f"**Salah:** {(y_true != y_pred).sum()}"
+                            f"**Total data:** {result.n_rows} | "
+                            f"**Berlabel:** {evaluation.n_labelled} | "
+                            f"**Benar:** {result.n_correct} | "
+                            f"**Salah:** {evaluation.n_labelled - result.n_correct}"
                         )
+                        if evaluation.n_unknown or evaluation.missing_labels:
+                            st.warning(f"⚠️ {evaluation.n_unknown} baris berlabel tidak dikenal model dan "
+                                       f"{evaluation.missing_labels} baris tanpa label tidak ikut dihitung.")
+                            if evaluation.n_unknown:
+                                st.dataframe(evaluation.unknown_frame())
 
                         # Confusion Matrix
-                        cm = confusion_matrix(y_true, y_pred)
-                        df_cm = pd.DataFrame(cm, index=label_encoder.classes_, columns=label_encoder.classes_)
                         st.subheader("📌 Confusion Matrix")
-                        st.dataframe(df_cm)
+                        st.dataframe(result.confusion_frame())
+
+                        st.subheader("📐 Precision, Recall dan F1 per Kelas")
+                        st.dataframe(evaluation.per_class_frame())
+
+                        st.subheader("🎚️ Kalibrasi Probabilitas")
+                        ece = evaluation.expected_calibration_error()
+                        if ece is not None:
+                            st.caption(f"Expected calibration error: {ece:.4f}")
+                        st.dataframe(evaluation.calibration_frame())
+                        st.download_button("⬇️ Unduh Laporan Evaluasi (.xlsx)", evaluation.report_excel(),
+                                           file_name="laporan_evaluasi.xlsx",
+                                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
                     # ======== Jika tidak ada label, tampilkan distribusi prediksi ========
                     else:
-                        y_pred = svm_model.predict(X_test)
-                        pred_labels = label_encoder.inverse_transform(y_pred)
-                        pred_counts = pd.Series(pred_labels).value_counts().reset_index()
-                        pred_counts.columns = ["Kategori Diagnosis", "Jumlah Prediksi"]
                         st.info("📊 Data tidak memiliki label asli. Berikut distribusi prediksi:")
-                        st.dataframe(pred_counts)
+                        st.caption(f"Versi model: {bundle.version}")
+                        st.dataframe(result.distribution_frame())
 
-                    # Tampilkan hasil prediksi lengkap
-                    df_test_raw["Prediksi"] = label_encoder.inverse_transform(svm_model.predict(X_test))
+                    # Tampilkan pratinjau hasil prediksi; hasil lengkap bisa diunduh
                     st.subheader("📋 Hasil Prediksi")
-                    st.dataframe(df_test_raw)
+                    if result.n_rows > bulk.PREVIEW_ROWS:
+                        st.caption(f"Menampilkan {bulk.PREVIEW_ROWS:,} dari {result.n_rows:,} baris.")
+                    st.dataframe(result.preview_frame())
+                    dedup = result.dedup
+                    st.caption(f"Baris unik yang diprediksi: {dedup.n_unique:,} dari {dedup.n_rows:,} "
+                               f"({dedup.duplicate_ratio:.1%} duplikat) · perkiraan waktu prediksi dihemat "
+                               f"{max(dedup.estimated_saved_seconds, 0.0):.2f} detik")
+                    st.download_button("⬇️ Unduh Hasil Prediksi (.csv)", result.csv_bytes(),
+                                       file_name="hasil_prediksi.csv", mime="text/csv")
 
                 except Exception as e:
                     st.error(f"❌ Gagal memproses data: {e}")
@@ -164,30 +220,22 @@ elif menu == "📈 Diagnosis":
                 'Umur': st.number_input("Umur", min_value=0, max_value=90, value=30)
             }
 
-            gejala_list = [
-                'Demam', 'Kelelahan', 'Kehilangan Nafsu Makan', 'Mual dan Muntah', 'Nyeri Perut Kanan Atas',
-                'Urin Gelap', 'Feses Pucat', 'Ikterus', 'Gatal', 'Edema/Ascites',
-                'Diare/Gangguan Pencernaan', 'Berat Badan Turun', 'Ruam/Nyeri Sendi', 'Menggigil'
-            ]
-
-            for g in gejala_list:
+            for g in SYMPTOM_COLUMNS:
                 data_input[g] = 1 if st.radio(g, ["Ya", "Tidak"], key=g) == "Ya" else 0
 
             if st.button("🔍 Prediksi Sekarang"):
-                data_input['JK'] = jk_encode(data_input['JK'])
-
-                # Buat input_df lengkap
-                input_df = pd.DataFrame([[data_input[col] for col in used_columns]], columns=used_columns).fillna(0)
+                # Encode semua kolom sekaligus (normalisasi sudah dilebur ke scorer model)
+                with instrumentation.timer("encode"):
+                    input_matrix = encode_record(data_input, used_columns)
 
-                # Normalisasi semua kolom sekaligus
-                input_scaled = scaler.transform(input_df)
-
-                # Prediksi
-                pred = svm_model.predict(input_scaled)[0]
-                probas = svm_model.predict_proba(input_scaled)[0]
-                hasil = label_encoder.inverse_transform([pred])[0]
+                # Prediksi (dari cache jika kombinasi input ini pernah diprediksi)
+                pred, probas = prediction_cache.predict(bundle, input_matrix)
+                instrumentation.inc("predictions_total", source="manual")
+                hasil = bundle.classes_[pred]
 
                 st.success(f"🧾 Prediksi Diagnosis: **{hasil}**")
+                st.caption(f"Versi model: {bundle.version}")
+                show_explanation(bundle, input_matrix, pred, probas)
 
                 # Tampilkan keterangan dan tindakan
                 penjelasan = {
@@ -250,56 +298,69 @@ elif menu == "🧪 Uji Dengan Data Baru":
 
     if training_file:
         try:
-            df = pd.read_excel(training_file)
+            training_data = training_file.getvalue()
+            df = read_training_file(training_data)
             st.write("Preview Data:", df.head())
 
-            df["JK"] = df["JK"].astype(str).str[0]
-            jk_encoder = LabelEncoder()
-            df["JK"] = jk_encoder.fit_transform(df["JK"])
-
-            label_encoder = LabelEncoder()
-            df["label"] = label_encoder.fit_transform(df["Kategori Diagnosis"])
-
             # ⬅️ Menampilkan jumlah kategori diagnosis
             st.markdown("### 📊 Jumlah Kategori Diagnosis")
             st.dataframe(df["Kategori Diagnosis"].value_counts().reset_index().rename(columns={
                 "index": "Kategori Diagnosis", "Kategori Diagnosis": "Jumlah"
             }))
 
-            # Pra-pemrosesan fitur
-            used_columns = ['JK', 'Umur'] + [col for col in df.columns if col not in ['Kategori Diagnosis', 'label', 'JK', 'Umur']]
-            for col in used_columns:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].apply(lambda x: 1 if str(x).strip().lower() == "ya" else 0)
-
-            scaler = MinMaxScaler()
-            df[['Umur']] = scaler.fit_transform(df[['Umur']])
-
-            X_train = df[used_columns].fillna(0)
-            y_train = df["label"]
-
             use_smote = st.checkbox("Gunakan SMOTE untuk penyeimbangan data", value=False)
+
+            # Pipeline training yang sama dengan model utama, dijalankan sebagai job di latar belakang.
+            # Versi = fingerprint file + parameter, jadi rerun dengan input sama tidak melatih ulang.
+            params = dict(training.HYPERPARAMS, smote=use_smote)
+            version = training.fingerprint(training_data, params)
+            job_manager = get_job_manager()
+            job = job_manager.get(st.session_state.get("uji_job_id"))
+            if job is None or job.version != version:
+                # File atau parameter berubah; job lama sesi ini tidak diperlukan lagi
+                if job is not None and job.active:
+                    job_manager.cancel(job.id)
+                job = job_manager.submit(training_data, params, source=training_file.name)
+                st.session_state["uji_job_id"] = job.id
+
+            if job.active:
+                st.progress(job.progress, text=f"⏳ {jobs.STATUS_LABELS[job.status]} (job {job.id}) {job.message}")
+                if st.button("❌ Batalkan Training"):
+                    job_manager.cancel(job.id)
+                    st.rerun()
+                # Cek status lagi sebentar lagi; server tetap bebas melayani sesi lain
+                time.sleep(1)
+                st.rerun()
+
+            if job.status in (jobs.CANCELLED, jobs.FAILED):
+                if job.status == jobs.CANCELLED:
+                    st.warning(f"⚠️ Training dibatalkan (job {job.id}).")
+                else:
+                    st.error(f"❌ Training gagal: {job.error}")
+                if st.button("🔁 Latih Ulang"):
+                    st.session_state["uji_job_id"] = job_manager.submit(
+                        training_data, params, source=training_file.name).id
+                    st.rerun()
+                st.stop()
+
+            uji_bundle = model_store.get(version)
             if use_smote:
-                smote = SMOTE()
-                X_train, y_train = smote.fit_resample(X_train, y_train)
                 st.info("✅ SMOTE berhasil diterapkan.")
 
-            model = SVC(kernel="linear", probability=True)
-            model.fit(X_train, y_train)
-
             # ===== Akurasi Training =====
-            y_pred_train = model.predict(X_train)
-            acc_train = accuracy_score(y_train, y_pred_train) * 100
+            acc_train = uji_bundle.metadata["accuracy"] * 100
             st.info(f"🎯 Akurasi Model di Data Training: **{acc_train:.2f}%**")
             st.markdown("---")
 
-            joblib.dump(model, "svm_model.pkl")
-            joblib.dump(jk_encoder, "jk_encoder.pkl")
-            joblib.dump(label_encoder, "label_encoder.pkl")
-            joblib.dump(used_columns, "used_columns.pkl")
-            joblib.dump(scaler, "scaler.pkl")
+            # Publikasikan sebagai versi aktif (atomic) untuk semua sesi, sekali per pilihan
+            if st.session_state.get("uji_published_version") != version:
+                if model_store.current_version() != version:
+                    model_store.publish(uji_bundle)
+                st.session_state["uji_published_version"] = version
+                st.session_state["model_version"] = version
+            used_columns = uji_bundle.used_columns
 
-            st.success("✅ Model berhasil dilatih dan disimpan.")
+            st.success(f"✅ Model berhasil dilatih dan disimpan (versi {uji_bundle.version}).")
             st.markdown("---")
 
             evaluasi_mode = st.radio("🧪 Prediksi Dengan Data Baru:", ["📂 Upload Data Masal", "✍️ Input Manual"], horizontal=True)
@@ -309,39 +370,18 @@ elif menu == "🧪 Uji Dengan Data Baru":
                                                 key="uji_testing_dari_training")
                 if testing_file:
                     try:
-                        df_test = pd.read_excel(testing_file)
+                        # File uji sekali pakai: dibaca langsung, tidak disimpan ke cache ingest
+                        with instrumentation.timer("parse"):
+                            df_test = pd.read_excel(testing_file)
 
-                        # Tambahkan kolom yang hilang agar sesuai dengan used_columns
-                        for col in used_columns:
-                            if col not in df_test.columns:
-                                df_test[col] = "Tidak"
-
-                        # Proses JK
-                        df_test["JK_model"] = df_test["JK"].astype(str).str[0]
-                        df_test["JK_model"] = jk_encoder.transform(df_test["JK_model"])
-
-                        # Proses Umur
-                        df_test["Umur_model"] = scaler.transform(df_test[["Umur"]])
-
-                        # Proses kolom gejala → buat salinan kolom gejala_model
-                        gejala_cols = [col for col in used_columns if col not in ["JK", "Umur"]]
-                        X_gejala = df_test[gejala_cols].applymap(lambda x: 1 if str(x).strip().lower() == "ya" else 0)
-
-                        # Siapkan X_test final untuk model (JK_model, Umur_model, Gejala)
-                        X_test = pd.concat([
-                            df_test[["JK_model", "Umur_model"]].rename(
-                                columns={"JK_model": "JK", "Umur_model": "Umur"}),
-                            X_gejala
-                        ], axis=1)
-
-                        X_test = X_test[used_columns].fillna(0)
+                        # Encode JK dan kolom gejala; df_test tetap asli untuk ditampilkan
+                        with instrumentation.timer("encode"):
+                            X_test = encode_features(df_test, used_columns)
 
                         # Prediksi
-                        y_pred = model.predict(X_test)
-                        df_test["Hasil Prediksi"] = label_encoder.inverse_transform(y_pred)
-
-                        # 👉 Drop kolom JK_model dan Umur_model agar tidak tampil di output
-                        df_test = df_test.drop(columns=["JK_model", "Umur_model"])
+                        df_test["Hasil Prediksi"] = uji_bundle.predict_labels(X_test)
+                        instrumentation.inc("predictions_total", len(X_test), source="bulk")
+                        st.caption(f"Versi model: {uji_bundle.version}")
 
                         # Tampilkan df_test asli (tetap "Ya"/"Tidak", Umur asli, JK asli)
                         st.subheader("📄 Hasil Prediksi")
@@ -373,25 +413,21 @@ elif menu == "🧪 Uji Dengan Data Baru":
                 def yn(label):
                     return 1 if st.radio(label, ["Ya", "Tidak"], key=label) == "Ya" else 0
 
-                gejala_list = [
-                    'Demam', 'Kelelahan', 'Kehilangan Nafsu Makan', 'Mual dan Muntah', 'Nyeri Perut Kanan Atas',
-                    'Urin Gelap', 'Feses Pucat', 'Ikterus', 'Gatal', 'Edema/Ascites',
-                    'Diare/Gangguan Pencernaan', 'Berat Badan Turun', 'Ruam/Nyeri Sendi', 'Menggigil'
-                ]
-                for g in gejala_list:
+                for g in SYMPTOM_COLUMNS:
                     manual_input[g] = yn(g)
 
                 if st.button("🔍 Prediksi Sekarang"):
                     try:
-                        manual_input["JK"] = jk_encoder.transform([manual_input["JK"][0]])[0]
-                        manual_input["Umur"] = scaler.transform([[manual_input["Umur"]]])[0][0]
-                        input_df = pd.DataFrame([[manual_input[col] for col in used_columns]], columns=used_columns).fillna(0)
+                        with instrumentation.timer("encode"):
+                            input_matrix = encode_record(manual_input, used_columns)
 
-                        pred = model.predict(input_df)[0]
-                        probas = model.predict_proba(input_df)[0]
-                        hasil = label_encoder.inverse_transform([pred])[0]
+                        pred, probas = prediction_cache.predict(uji_bundle, input_matrix)
+                        instrumentation.inc("predictions_total", source="manual")
+                        hasil = uji_bundle.classes_[pred]
 
                         st.success(f"🧾 Prediksi Diagnosis: **{hasil}**")
+                        st.caption(f"Versi model: {uji_bundle.version}")
+                        show_explanation(uji_bundle, input_matrix, pred, probas)
 
                         # Tampilkan keterangan dan tindakan
                         penjelasan = {
@@ -449,3 +485,6 @@ elif menu == "🧪 Uji Dengan Data Baru":
 
         except Exception as e:
             st.error(f"❌ Terjadi kesalahan saat memproses data training: {e}")
+
+# Waktu render satu rerun (tidak tercatat jika rerun dihentikan lewat st.rerun/st.stop)
+instrumentation.observe("stage_seconds", time.perf_counter() - render_start, stage="render", page=menu)
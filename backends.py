@@ -0,0 +1,125 @@
+# ====================== BACKEND KLASIFIKASI ======================
+# Model yang bisa dipilih saat training (params["backend"]). Semua backend
+# menghasilkan estimator sklearn dengan predict/predict_proba, sehingga format
+# bundle, aplikasi Streamlit, API dan prediksi masal tidak perlu berubah.
+#
+#   svc         SVC (default); probability=True memakai kalibrasi Platt internal (5-fold)
+#   linear_svc  LinearSVC (liblinear, linear dalam jumlah sampel) + kalibrasi sigmoid
+#   sgd         SGDClassifier hinge loss + kalibrasi sigmoid
+#   logreg      LogisticRegression (probabilitas langsung dari model)
+#   lookup      tabel hash baris fitur → distribusi kelas, fallback logistic regression
+#
+#   python backends.py        → bandingkan semua backend (akurasi k-fold, waktu, memori)
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.svm import SVC, LinearSVC
+
+BACKENDS = ["svc", "linear_svc", "sgd", "logreg", "lookup"]
+DEFAULT_BACKEND = "svc"
+CALIBRATION_FOLDS = 3
+
+
+def _row_hash(X):
+    # Hash 64-bit per baris (kombinasi hash tiap kolom)
+    return pd.util.hash_pandas_object(pd.DataFrame(X), index=False).to_numpy()
+
+
+class LookupClassifier(ClassifierMixin, BaseEstimator):
+    # Ruang fitur diskrit (gejala biner, JK, umur bulat) membuat banyak baris identik.
+    # Baris yang pernah dilihat saat training dijawab dari tabel frekuensi kelas;
+    # baris baru diteruskan ke model fallback.
+    def __init__(self, C=1.0, class_weight=None):
+        self.C = C
+        self.class_weight = class_weight
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_ = np.unique(y)
+        y_idx = np.searchsorted(self.classes_, y)
+
+        hashes, inverse = np.unique(_row_hash(X), return_inverse=True)
+        counts = np.zeros((len(hashes), len(self.classes_)))
+        np.add.at(counts, (inverse.ravel(), y_idx), 1)
+        self.hashes_ = hashes
+        self.table_ = counts / counts.sum(axis=1, keepdims=True)
+
+        self.fallback_ = LogisticRegression(C=self.C, class_weight=self.class_weight, max_iter=1000)
+        self.fallback_.fit(X, y)
+        return self
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        hashes = _row_hash(X)
+        pos = np.minimum(np.searchsorted(self.hashes_, hashes), len(self.hashes_) - 1)
+        found = self.hashes_[pos] == hashes
+
+        proba = np.empty((len(X), len(self.classes_)))
+        proba[found] = self.table_[pos[found]]
+        if not found.all():
+            proba[~found] = self.fallback_.predict_proba(X[~found])
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def make_model(params):
+    backend = params.get("backend", DEFAULT_BACKEND)
+    C = params.get("C", 1.0)
+    class_weight = params.get("class_weight")
+    random_state = params.get("random_state")
+
+    if backend == "svc":
+        return SVC(kernel=params.get("kernel", "linear"), C=C, class_weight=class_weight,
+                   probability=params.get("probability", True), random_state=random_state)
+    if backend == "logreg":
+        return LogisticRegression(C=C, class_weight=class_weight, max_iter=1000)
+    if backend == "lookup":
+        return LookupClassifier(C=C, class_weight=class_weight)
+
+    if backend == "linear_svc":
+        model = LinearSVC(C=C, class_weight=class_weight, random_state=random_state)
+    elif backend == "sgd":
+        # C tidak dipakai: regularisasi SGD lewat alpha (default), lihat search.grid_for
+        model = SGDClassifier(loss="hinge", class_weight=class_weight, random_state=random_state)
+    else:
+        raise ValueError(f"Backend tidak dikenal: {backend} (pilihan: {', '.join(BACKENDS)})")
+
+    if not params.get("probability", True):
+        return model
+    # Estimator sebagai argumen posisi: namanya berbeda antar versi sklearn (base_estimator/estimator)
+    return CalibratedClassifierCV(model, method="sigmoid", cv=CALIBRATION_FOLDS)
+
+
+COMPARE_GRID = {
+    "backend": BACKENDS,
+    "kernel": ["linear"],
+    "C": [1.0],
+    "class_weight": [None],
+    "smote": [True],
+    "probability": [True],
+}
+
+
+if __name__ == "__main__":
+    import search
+    from training import TRAINING_FILE
+
+    parser = argparse.ArgumentParser(description="Bandingkan backend klasifikasi dengan stratified k-fold")
+    parser.add_argument("--data", default=TRAINING_FILE)
+    search.add_arguments(parser)
+    args = parser.parse_args()
+
+    X, y = search.load_training_data(args.data)
+    board = search.run_search(X, y, grid=COMPARE_GRID, n_folds=args.folds, time_budget=args.time_budget,
+                              n_jobs=args.jobs)
+    columns = ["backend", "accuracy_mean", "f1_macro_mean", "fit_time_mean", "predict_us_per_row",
+               "fit_peak_mb", "model_kb"]
+    print(board[columns].to_string())
+    print("Perbandingan disimpan di", search.save_leaderboard(board, os.path.join(search.SEARCH_DIR, "backends")))
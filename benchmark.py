@@ -0,0 +1,230 @@
+# ====================== BENCHMARK PIPELINE ======================
+# Mengukur setiap tahap pipeline pada data pasien sintetis dengan skema yang
+# sama seperti used_columns (JK, Umur, 14 gejala Ya/Tidak + Kategori Diagnosis):
+# ingest CSV/Excel, encoding, scaling, SMOTE, fit SVC, predict, predict_proba
+# dan prediksi manual satu baris. Hasil (p50/p99, throughput per tahap, peak RSS
+# per ukuran data) ditulis ke JSON yang bisa di-diff antar versi.
+#
+#   python benchmark.py --sizes 1000 100000 1000000 --output benchmark.json
+#
+# SMOTE dan fit SVC (kompleksitas ~kuadratik) dibatasi --fit-max-rows baris,
+# penulisan/pembacaan Excel dibatasi --xlsx-max-rows baris.
+#
+# Cold start: proses Python baru merender halaman Beranda (streamlit AppTest)
+# dan harus selesai dalam COLD_START_BUDGET_SECONDS tanpa mengimpor dependensi
+# training (HEAVY_MODULES).
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+from imblearn.over_sampling import SMOTE
+from sklearn.preprocessing import MinMaxScaler
+
+import bulk
+import training
+from backends import make_model
+from encoder import FEATURE_COLUMNS, SYMPTOM_COLUMNS, TARGET_COLUMN, encode_features, encode_record
+
+CLASSES = ["Abses Hati", "Hepatitis Akut", "Hepatitis Kronis", "Infeksi Parasit atau Virus"]
+CLASS_WEIGHTS = [0.14, 0.32, 0.45, 0.09]
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_new.py")
+COLD_START_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ["sklearn", "imblearn", "scipy", "openpyxl"]
+COLD_START_SCRIPT = textwrap.dedent("""
+    import json, sys, time
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+    print(json.dumps({"render_seconds": time.perf_counter() - start, "errors": len(at.exception),
+                      "modules": sorted(sys.modules)}))
+""")
+
+
+def synthetic_table(n_rows, seed=0):
+    # Tiap kelas punya peluang gejala sendiri, supaya model punya pola untuk dipelajari
+    rng = np.random.default_rng(seed)
+    labels = rng.choice(len(CLASSES), size=n_rows, p=CLASS_WEIGHTS)
+    symptom_prob = rng.uniform(0.1, 0.9, size=(len(CLASSES), len(SYMPTOM_COLUMNS)))
+    has_symptom = rng.random((n_rows, len(SYMPTOM_COLUMNS))) < symptom_prob[labels]
+
+    df = pd.DataFrame({
+        "JK": np.where(rng.random(n_rows) < 0.5, "L", "P"),
+        "Umur": rng.integers(7, 84, size=n_rows),
+    })
+    for j, col in enumerate(SYMPTOM_COLUMNS):
+        df[col] = np.where(has_symptom[:, j], "Ya", "Tidak")
+    df[TARGET_COLUMN] = np.asarray(CLASSES)[labels]
+    return df
+
+
+def peak_rss_mb():
+    # ru_maxrss: kilobyte di Linux, byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def time_stage(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return np.asarray(timings), result
+
+
+def summarize(size, stage, timings, rows):
+    return {
+        "size": size,
+        "stage": stage,
+        "rows": rows,
+        "repeat": len(timings),
+        "p50_ms": float(np.percentile(timings, 50) * 1e3),
+        "p99_ms": float(np.percentile(timings, 99) * 1e3),
+        "mean_ms": float(timings.mean() * 1e3),
+        "throughput_rows_per_s": float(rows / max(np.percentile(timings, 50), 1e-9)),
+    }
+
+
+def run_size(size, repeat, fit_max_rows, xlsx_max_rows, single_iterations, log):
+    results = []
+
+    def record(stage, func, rows, n=repeat):
+        timings, value = time_stage(func, n)
+        results.append(summarize(size, stage, timings, rows))
+        log(f"  {stage:<22} p50 {results[-1]['p50_ms']:10.2f} ms  ({rows} baris)")
+        return value
+
+    df = synthetic_table(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "data.csv")
+        df.to_csv(csv_path, index=False)
+        record("ingest_csv", lambda: pd.read_csv(csv_path), size)
+
+        xlsx_rows = min(size, xlsx_max_rows)
+        xlsx_path = os.path.join(tmp, "data.xlsx")
+        df.head(xlsx_rows).to_excel(xlsx_path, index=False)
+        record("ingest_xlsx", lambda: pd.read_excel(xlsx_path), xlsx_rows)
+
+    X = record("encode", lambda: encode_features(df, FEATURE_COLUMNS), size)
+    labels = df[TARGET_COLUMN].to_numpy()
+
+    # Model dilatih dengan pipeline training yang sama (subset), lalu dipakai untuk tahap prediksi
+    fit_rows = min(size, fit_max_rows)
+    X_fit, labels_fit = X[:fit_rows], labels[:fit_rows]
+    y_fit = np.searchsorted(CLASSES, labels_fit)
+    X_res, y_res = record("smote", lambda: SMOTE(random_state=42).fit_resample(X_fit, y_fit), fit_rows)
+    # Hanya fit model, pada data yang sudah di-resample dan di-scale (tanpa evaluasi,
+    # kompilasi scorer dan explainer yang ikut dijalankan train_encoded)
+    X_res_scaled = MinMaxScaler().fit_transform(X_res)
+    record("svc_fit", lambda: make_model(training.HYPERPARAMS).fit(X_res_scaled, y_res), len(X_res))
+    bundle, _ = training.train_encoded(X_fit, labels_fit, FEATURE_COLUMNS, training.HYPERPARAMS, version="bench")
+
+    X_scaled = record("scale", lambda: bundle.scaler.transform(X), size)
+    record("predict", lambda: bundle.model.predict(X_scaled), size)
+    record("predict_proba", lambda: bundle.model.predict_proba(X_scaled), size)
+    if bundle.scorer is not None:
+        record("predict_compiled", lambda: bundle.predict(X), size)
+        record("predict_proba_compiled", lambda: bundle.predict_proba(X), size)
+
+    # Prediksi masal end-to-end per chunk (encode, dedup baris identik, prediksi, tulis CSV)
+    chunks = [df.iloc[i:i + bulk.CHUNK_ROWS] for i in range(0, size, bulk.CHUNK_ROWS)]
+    result = record("bulk_score", lambda: bulk.score_chunks(bundle, [c.copy() for c in chunks]), size)
+    results[-1]["dedup"] = result.dedup.to_dict()
+
+    # Prediksi manual: encode satu record + predict + predict_proba, diulang banyak kali
+    record_input = df.drop(columns=[TARGET_COLUMN]).iloc[0].to_dict()
+
+    def manual_prediction():
+        x = encode_record(record_input, bundle.used_columns)
+        return bundle.predict(x)[0], bundle.predict_proba(x)[0]
+
+    record("single_row_manual", manual_prediction, 1, n=single_iterations)
+    return results, {"size": size, "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def cold_start(runs, budget=COLD_START_BUDGET_SECONDS):
+    # Waktu total termasuk start interpreter, seperti pod baru yang melayani request pertama
+    timings, render_timings, heavy = [], [], set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT, APP_FILE], capture_output=True,
+                             text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        run = json.loads(out.stdout.strip().splitlines()[-1])
+        if run["errors"]:
+            raise RuntimeError("Halaman Beranda gagal dirender")
+        render_timings.append(run["render_seconds"])
+        heavy.update(m for m in run["modules"] if m.split(".")[0] in HEAVY_MODULES)
+
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "runs": runs,
+        "p50_s": p50,
+        "max_s": float(np.max(timings)),
+        "render_p50_s": float(np.percentile(render_timings, 50)),
+        "budget_s": budget,
+        "within_budget": p50 <= budget,
+        "heavy_modules_loaded": sorted({m.split(".")[0] for m in heavy}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline deteksi hepatitis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="pengulangan per tahap batch")
+    parser.add_argument("--fit-max-rows", type=int, default=5000, help="batas baris untuk SMOTE dan fit SVC")
+    parser.add_argument("--xlsx-max-rows", type=int, default=20_000, help="batas baris untuk ingest Excel")
+    parser.add_argument("--single-iterations", type=int, default=1000, help="pengulangan prediksi satu baris")
+    parser.add_argument("--cold-start-runs", type=int, default=3, help="0 untuk melewati pengukuran cold start")
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "params": training.HYPERPARAMS,
+            "args": vars(args),
+        },
+        "results": [],
+        # Peak RSS proses (monoton); ukuran dijalankan dari kecil ke besar, sehingga
+        # nilai per ukuran = puncak memori sampai ukuran itu selesai
+        "memory": [],
+    }
+    if args.cold_start_runs:
+        report["cold_start"] = cold_start(args.cold_start_runs)
+        print("Cold start Beranda:", report["cold_start"])
+
+    for size in sorted(args.sizes):
+        print(f"Ukuran data: {size} baris")
+        results, memory = run_size(size, args.repeat, args.fit_max_rows, args.xlsx_max_rows,
+                                   args.single_iterations, print)
+        report["results"].extend(results)
+        report["memory"].append(memory)
+        print(f"  peak RSS {memory['peak_rss_mb']:.1f} MB")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print("Hasil benchmark disimpan di", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# ====================== PREDIKSI MASAL (STREAMING) ======================
+# File diproses per potongan (chunk): dibaca, di-encode dan diprediksi sekali,
+# lalu jumlah prediksi dan evaluasi (lihat evaluation.py) diakumulasi. Hasil
+# lengkap ditulis ke file CSV sementara; di memori hanya disimpan beberapa baris
+# pratinjau. Beberapa file bisa diproses ke satu hasil yang sama.
+#
+# Ruang fitur kecil (14 gejala biner, JK, Umur bulat) membuat banyak baris
+# ter-encode identik. Per chunk, baris identik digabung (np.unique + inverse),
+# setiap vektor unik diprediksi sekali, lalu hasilnya disebar kembali per baris.
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from encoder import TARGET_COLUMN, encode_features
+from evaluation import Evaluation
+from explain import explanation_columns
+
+CHUNK_ROWS = 10_000
+PREVIEW_ROWS = 1_000
+SUPPORTED_TYPES = ["xlsx", "csv", "parquet"]
+PREDICTION_COLUMN = "Prediksi"
+
+
+def _file_type(name):
+    return os.path.splitext(name)[1].lower().lstrip(".")
+
+
+def _xlsx_chunks(ws, chunk_rows):
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+
+    batch = []
+    for row in rows:
+        # Mode read-only bisa menghasilkan baris kosong di akhir sheet
+        if all(v is None for v in row):
+            continue
+        batch.append(row)
+        if len(batch) == chunk_rows:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+
+def _iter_xlsx(file, chunk_rows):
+    from openpyxl import load_workbook
+
+    # read_only: sel dibaca secara streaming, bukan seluruh workbook ke memori
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from _xlsx_chunks(wb.worksheets[0], chunk_rows)
+    finally:
+        wb.close()
+
+
+def _iter_parquet(file, chunk_rows):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def _count_csv_rows(file, block_bytes=1 << 20):
+    # Perkiraan jumlah baris data (jumlah baris baru dikurangi header), dibaca per blok
+    # tanpa parsing; sel berisi baris baru membuat perkiraan sedikit berlebih
+    n_lines, last = 0, b"\n"
+    for block in iter(lambda: file.read(block_bytes), b""):
+        n_lines += block.count(b"\n")
+        last = block[-1:]
+    file.seek(0)
+    if last != b"\n":
+        n_lines += 1
+    return max(n_lines - 1, 0)
+
+
+def open_chunks(file, name, chunk_rows=CHUNK_ROWS):
+    # Mengembalikan (perkiraan jumlah baris atau None, generator DataFrame per chunk)
+    file_type = _file_type(name)
+    if file_type == "xlsx":
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file, read_only=True)
+        max_row = wb.worksheets[0].max_row
+        wb.close()
+        file.seek(0)
+        total = max_row - 1 if max_row else None
+        return total, _iter_xlsx(file, chunk_rows)
+    if file_type == "csv":
+        total = _count_csv_rows(file)
+        return total, iter(pd.read_csv(file, chunksize=chunk_rows))
+    if file_type == "parquet":
+        import pyarrow.parquet as pq
+
+        total = pq.ParquetFile(file).metadata.num_rows
+        file.seek(0)
+        return total, _iter_parquet(file, chunk_rows)
+    raise ValueError(f"Format file .{file_type} tidak didukung (gunakan {', '.join(SUPPORTED_TYPES)})")
+
+
+def unique_rows(X):
+    # (indeks kemunculan pertama tiap baris unik, inverse: baris → indeks baris unik)
+    X = np.ascontiguousarray(X)
+    # Setiap baris dilihat sebagai satu nilai bytes, sehingga np.unique 1-D bisa dipakai
+    rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return index, inverse.ravel()
+
+
+class DedupStats:
+    def __init__(self):
+        self.n_rows = 0
+        self.n_unique = 0
+        self.dedup_seconds = 0.0
+        self.score_seconds = 0.0
+
+    def add(self, n_rows, n_unique, dedup_seconds, score_seconds):
+        self.n_rows += n_rows
+        self.n_unique += n_unique
+        self.dedup_seconds += dedup_seconds
+        self.score_seconds += score_seconds
+
+    @property
+    def duplicate_ratio(self):
+        return 1 - self.n_unique / self.n_rows if self.n_rows else 0.0
+
+    @property
+    def estimated_saved_seconds(self):
+        # Perkiraan: waktu prediksi sebanding jumlah baris, dikurangi biaya np.unique
+        if not self.n_unique:
+            return 0.0
+        full = self.score_seconds * self.n_rows / self.n_unique
+        return full - self.score_seconds - self.dedup_seconds
+
+    def to_dict(self):
+        return {
+            "rows": self.n_rows,
+            "unique_rows": self.n_unique,
+            "duplicate_ratio": self.duplicate_ratio,
+            "dedup_seconds": self.dedup_seconds,
+            "score_seconds": self.score_seconds,
+            "estimated_saved_seconds": self.estimated_saved_seconds,
+        }
+
+
+class BulkResult:
+    def __init__(self, classes):
+        self.classes = np.asarray(classes)
+        self.n_rows = 0
+        self.dedup = DedupStats()
+        self.pred_counts = np.zeros(len(classes), dtype=np.int64)
+        # Evaluation, dibuat saat chunk berlabel pertama datang
+        self.evaluation = None
+        self.columns = None
+        self.preview = []
+        self.output = tempfile.TemporaryFile(mode="w+b")
+
+    @property
+    def labelled(self):
+        return self.evaluation is not None
+
+    @property
+    def n_correct(self):
+        return self.evaluation.n_correct if self.labelled else None
+
+    @property
+    def accuracy(self):
+        return self.evaluation.accuracy if self.labelled else None
+
+    def confusion_frame(self):
+        return self.evaluation.confusion_frame()
+
+    def distribution_frame(self):
+        return pd.DataFrame({
+            "Kategori Diagnosis": self.classes,
+            "Jumlah Prediksi": self.pred_counts,
+        }).sort_values("Jumlah Prediksi", ascending=False, ignore_index=True)
+
+    def preview_frame(self):
+        return pd.concat(self.preview, ignore_index=True) if self.preview else pd.DataFrame()
+
+    def csv_bytes(self):
+        self.output.seek(0)
+        return self.output.read()
+
+    def add_chunk(self, chunk, y_pred, proba=None, source=None, extra=None):
+        self.pred_counts += np.bincount(y_pred, minlength=len(self.classes))
+        if TARGET_COLUMN in chunk.columns:
+            if self.evaluation is None:
+                self.evaluation = Evaluation(self.classes)
+            self.evaluation.update(chunk[TARGET_COLUMN], y_pred, proba, source=source)
+
+        # Kolom mengikuti chunk pertama, agar CSV gabungan beberapa file tetap sejajar
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        chunk = chunk.reindex(columns=self.columns)
+        chunk[PREDICTION_COLUMN] = self.classes[y_pred]
+        for name, values in (extra or {}).items():
+            chunk[name] = values
+        chunk.to_csv(self.output, header=self.n_rows == 0, index=False, encoding="utf-8")
+        if self.n_rows < PREVIEW_ROWS:
+            self.preview.append(chunk.head(PREVIEW_ROWS - self.n_rows))
+        self.n_rows += len(chunk)
+
+
+def iter_scored(bundle, chunks, with_proba="labelled", stats=None):
+    # Setiap chunk di-encode sekali dan tiap baris unik diprediksi sekali;
+    # yield (chunk, X, y_pred, proba atau None, (index, inverse) dari unique_rows).
+    # with_proba="labelled": probabilitas (untuk bin kalibrasi) hanya dihitung untuk chunk berlabel
+    chunks = iter(chunks)
+    while True:
+        # Chunk dibaca secara lazy, jadi waktu parse diukur saat chunk diambil
+        with instrumentation.timer("parse"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        with instrumentation.timer("encode"):
+            X = encode_features(chunk, bundle.used_columns)
+        start = time.perf_counter()
+        with instrumentation.timer("dedup"):
+            index, inverse = unique_rows(X)
+        X_unique = X[index]
+        dedup_seconds = time.perf_counter() - start
+
+        chunk_proba = TARGET_COLUMN in chunk.columns if with_proba == "labelled" else with_proba
+        start = time.perf_counter()
+        y_pred = bundle.predict(X_unique)[inverse]
+        proba = bundle.predict_proba(X_unique)[inverse] if chunk_proba else None
+        if stats is not None:
+            stats.add(len(X), len(index), dedup_seconds, time.perf_counter() - start)
+        instrumentation.inc("predictions_total", len(X), source="bulk")
+        yield chunk, X, y_pred, proba, (index, inverse)
+
+
+def score_chunks(bundle, chunks, on_progress=None, result=None, source=None, explain=False):
+    # result: BulkResult yang sudah ada untuk melanjutkan akumulasi (file berikutnya).
+    # explain: tambahkan kolom probabilitas per kelas dan faktor utama (lihat explain.py)
+    if result is None:
+        result = BulkResult(bundle.classes_)
+    for chunk, X, y_pred, proba, dedup in iter_scored(bundle, chunks, with_proba=True if explain else "labelled",
+                                                      stats=result.dedup):
+        extra = explanation_columns(bundle, X, y_pred, proba, dedup) if explain else None
+        result.add_chunk(chunk, y_pred, proba, source=source, extra=extra)
+        if on_progress is not None:
+            on_progress(result.n_rows)
+    return result
@@ -0,0 +1,95 @@
+# ====================== ENCODER FITUR ======================
+# Satu encoder untuk training, prediksi masal dan input manual. Skema kolom
+# (used_columns) menentukan urutan fitur; kolom JK dan Umur ditangani khusus,
+# kolom lain dianggap gejala Ya/Tidak. Hasilnya matriks float32 C-contiguous.
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+JK_COLUMN = "JK"
+AGE_COLUMN = "Umur"
+TARGET_COLUMN = "Kategori Diagnosis"
+
+JK_MAP = {"P": 0, "L": 1}
+
+SYMPTOM_COLUMNS = [
+    'Demam', 'Kelelahan', 'Kehilangan Nafsu Makan', 'Mual dan Muntah', 'Nyeri Perut Kanan Atas',
+    'Urin Gelap', 'Feses Pucat', 'Ikterus', 'Gatal', 'Edema/Ascites',
+    'Diare/Gangguan Pencernaan', 'Berat Badan Turun', 'Ruam/Nyeri Sendi', 'Menggigil'
+]
+FEATURE_COLUMNS = [JK_COLUMN, AGE_COLUMN] + SYMPTOM_COLUMNS
+
+
+def encode_jk_value(value):
+    # "L", "Laki-laki" → 1; "P", "Perempuan" → 0; selain itu 0
+    if isinstance(value, (int, float, np.number)):
+        return 0.0 if pd.isna(value) else float(value)
+    return float(JK_MAP.get(str(value).strip()[:1].upper(), 0))
+
+
+def encode_symptom_value(value):
+    # Angka (mis. dari input manual) dipakai apa adanya; teks hanya "Ya" yang bernilai 1
+    if isinstance(value, (int, float, np.number)):
+        return 0.0 if pd.isna(value) else float(value)
+    return 1.0 if str(value).strip().lower() == "ya" else 0.0
+
+
+def encode_age_value(value):
+    value = pd.to_numeric(value, errors="coerce")
+    return 0.0 if pd.isna(value) else float(value)
+
+
+def _value_encoder(column):
+    if column == JK_COLUMN:
+        return encode_jk_value
+    if column == AGE_COLUMN:
+        return encode_age_value
+    return encode_symptom_value
+
+
+def _encode_series(series, column):
+    if is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float32, na_value=0)
+    if column == AGE_COLUMN:
+        return pd.to_numeric(series, errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+
+    # Kode kategori (hash) sekali jalan; fungsi encode hanya dipanggil per nilai unik.
+    # Kode -1 (NaN) jatuh ke slot terakhir tabel yang bernilai 0.
+    codes, uniques = pd.factorize(series)
+    encode_value = _value_encoder(column)
+    table = np.fromiter((encode_value(v) for v in uniques), dtype=np.float32, count=len(uniques))
+    return np.append(table, np.float32(0))[codes]
+
+
+def feature_columns(df):
+    # Skema training: semua kolom kecuali target, sesuai urutan di workbook
+    return [col for col in df.columns if col != TARGET_COLUMN]
+
+
+def target_labels(df):
+    # Label training sebagai array string; sel kosong ditolak (seperti LabelEncoder semula),
+    # bukan dijadikan kelas "nan"
+    labels = df[TARGET_COLUMN]
+    missing = labels.isna() | (labels.astype(object).map(str).str.strip() == "")
+    if missing.any():
+        raise ValueError(f"Kolom '{TARGET_COLUMN}' kosong pada {int(missing.sum())} baris; "
+                         f"lengkapi atau hapus baris tersebut sebelum training")
+    return np.asarray([str(v) for v in labels], dtype=str)
+
+
+def encode_features(df, columns=FEATURE_COLUMNS):
+    X = np.zeros((len(df), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        # Kolom yang tidak ada di file dianggap 0 (seperti reindex fill_value=0)
+        if col in df.columns:
+            X[:, j] = _encode_series(df[col], col)
+    return X
+
+
+def encode_record(record, columns=FEATURE_COLUMNS):
+    # Satu pasien (dict) → matriks 1 x n tanpa membuat DataFrame
+    X = np.zeros((1, len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        if col in record:
+            X[0, j] = _value_encoder(col)(record[col])
+    return X
@@ -0,0 +1,257 @@
+# ====================== EVALUASI INKREMENTAL ======================
+# Akumulasi hasil evaluasi per chunk (atau per file) tanpa menyimpan data:
+# confusion matrix, precision/recall/F1 per kelas dan bin kalibrasi probabilitas.
+# Label yang tidak dikenal model (di luar label_encoder.classes_) tidak membuat
+# proses gagal; barisnya dicatat terpisah dan tidak ikut dihitung di akurasi.
+# State evaluasi bisa disimpan (to_dict) dan digabung (merge), sehingga laporan
+# beberapa batch bulanan bisa digabung tanpa memprediksi ulang.
+#
+#   python evaluation.py januari.parquet februari.csv --output laporan.xlsx
+import argparse
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+N_BINS = 10
+
+
+class Evaluation:
+    def __init__(self, classes, n_bins=N_BINS):
+        self.classes = np.asarray(classes)
+        n_classes = len(self.classes)
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        # Label tak dikenal → jumlah prediksi per kelas
+        self.unknown = {}
+        self.missing_labels = 0
+        self.bin_count = np.zeros(n_bins, dtype=np.int64)
+        self.bin_confidence = np.zeros(n_bins)
+        self.bin_correct = np.zeros(n_bins, dtype=np.int64)
+        self.sources = {}
+
+    @property
+    def n_bins(self):
+        return len(self.bin_count)
+
+    @property
+    def n_labelled(self):
+        return int(self.confusion.sum())
+
+    @property
+    def n_correct(self):
+        return int(np.trace(self.confusion))
+
+    @property
+    def n_unknown(self):
+        return int(sum(counts.sum() for counts in self.unknown.values()))
+
+    @property
+    def accuracy(self):
+        return self.n_correct / self.n_labelled if self.n_labelled else None
+
+    def update(self, labels, y_pred, proba=None, source=None):
+        # labels: label asli (teks); y_pred: indeks kelas; proba: matriks probabilitas (opsional)
+        labels = pd.Series(labels).reset_index(drop=True)
+        y_pred = np.asarray(y_pred)
+        if source is not None:
+            self.sources[source] = self.sources.get(source, 0) + len(labels)
+
+        missing = labels.isna().to_numpy() | (labels.astype(str).str.strip() == "").to_numpy()
+        self.missing_labels += int(missing.sum())
+        y_true = pd.Index(self.classes).get_indexer(labels.where(~missing).astype(str).str.strip())
+        known = (y_true >= 0) & ~missing
+        np.add.at(self.confusion, (y_true[known], y_pred[known]), 1)
+
+        unknown = ~known & ~missing
+        if unknown.any():
+            n_classes = len(self.classes)
+            for label, group in pd.Series(y_pred[unknown]).groupby(labels[unknown].astype(str).to_numpy()):
+                counts = self.unknown.setdefault(label, np.zeros(n_classes, dtype=np.int64))
+                counts += np.bincount(group.to_numpy(), minlength=n_classes)
+
+        if proba is not None and known.any():
+            # Keyakinan = probabilitas kelas yang diprediksi
+            confidence = np.asarray(proba)[known, y_pred[known]]
+            bins = np.minimum((confidence * self.n_bins).astype(np.int64), self.n_bins - 1)
+            correct = y_true[known] == y_pred[known]
+            self.bin_count += np.bincount(bins, minlength=self.n_bins)
+            self.bin_confidence += np.bincount(bins, weights=confidence, minlength=self.n_bins)
+            self.bin_correct += np.bincount(bins, weights=correct, minlength=self.n_bins).astype(np.int64)
+
+    def merge(self, other):
+        if list(other.classes) != list(self.classes) or other.n_bins != self.n_bins:
+            raise ValueError("Evaluasi hanya bisa digabung untuk kelas dan jumlah bin yang sama")
+        self.confusion += other.confusion
+        for label, counts in other.unknown.items():
+            self.unknown[label] = self.unknown.get(label, 0) + counts
+        self.missing_labels += other.missing_labels
+        self.bin_count += other.bin_count
+        self.bin_confidence += other.bin_confidence
+        self.bin_correct += other.bin_correct
+        for source, n_rows in other.sources.items():
+            self.sources[source] = self.sources.get(source, 0) + n_rows
+        return self
+
+    # ====================== TABEL LAPORAN ======================
+    def confusion_frame(self):
+        return pd.DataFrame(self.confusion, index=self.classes, columns=self.classes)
+
+    def per_class_frame(self):
+        tp = np.diag(self.confusion).astype(float)
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        frame = pd.DataFrame({
+            "Kelas": self.classes,
+            "Precision": precision,
+            "Recall": recall,
+            "F1": f1,
+            "Jumlah Data": support,
+            "Jumlah Prediksi": predicted,
+        })
+        total = max(support.sum(), 1)
+        averages = pd.DataFrame({
+            "Kelas": ["Rata-rata (macro)", "Rata-rata (weighted)"],
+            "Precision": [precision.mean(), (precision * support).sum() / total],
+            "Recall": [recall.mean(), (recall * support).sum() / total],
+            "F1": [f1.mean(), (f1 * support).sum() / total],
+            "Jumlah Data": [support.sum()] * 2,
+            "Jumlah Prediksi": [predicted.sum()] * 2,
+        })
+        return pd.concat([frame, averages], ignore_index=True)
+
+    def calibration_frame(self):
+        edges = np.linspace(0, 1, self.n_bins + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confidence = np.where(self.bin_count > 0, self.bin_confidence / self.bin_count, np.nan)
+            accuracy = np.where(self.bin_count > 0, self.bin_correct / self.bin_count, np.nan)
+        return pd.DataFrame({
+            "Rentang Keyakinan": [f"{lo:.1f}-{hi:.1f}" for lo, hi in zip(edges[:-1], edges[1:])],
+            "Jumlah": self.bin_count,
+            "Rata-rata Keyakinan": confidence,
+            "Akurasi": accuracy,
+        })
+
+    def expected_calibration_error(self):
+        # ECE: selisih keyakinan dan akurasi, dibobot jumlah data per bin
+        total = self.bin_count.sum()
+        if not total:
+            return None
+        gap = np.abs(self.bin_confidence - self.bin_correct)
+        return float(gap.sum() / total)
+
+    def unknown_frame(self):
+        rows = [dict({"Label": label, "Jumlah": int(counts.sum())},
+                     **{f"Prediksi {c}": int(n) for c, n in zip(self.classes, counts)})
+                for label, counts in sorted(self.unknown.items())]
+        return pd.DataFrame(rows)
+
+    def summary(self):
+        return {
+            "labelled_rows": self.n_labelled,
+            "correct": self.n_correct,
+            "accuracy": self.accuracy,
+            "unknown_label_rows": self.n_unknown,
+            "missing_label_rows": self.missing_labels,
+            "expected_calibration_error": self.expected_calibration_error(),
+            "sources": dict(self.sources),
+        }
+
+    # ====================== SIMPAN / MUAT / EKSPOR ======================
+    def to_dict(self):
+        return {
+            "classes": self.classes.tolist(),
+            "confusion": self.confusion.tolist(),
+            "unknown": {label: counts.tolist() for label, counts in self.unknown.items()},
+            "missing_labels": self.missing_labels,
+            "bin_count": self.bin_count.tolist(),
+            "bin_confidence": self.bin_confidence.tolist(),
+            "bin_correct": self.bin_correct.tolist(),
+            "sources": dict(self.sources),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        evaluation = cls(state["classes"], n_bins=len(state["bin_count"]))
+        evaluation.confusion = np.asarray(state["confusion"], dtype=np.int64)
+        evaluation.unknown = {label: np.asarray(c, dtype=np.int64) for label, c in state["unknown"].items()}
+        evaluation.missing_labels = state["missing_labels"]
+        evaluation.bin_count = np.asarray(state["bin_count"], dtype=np.int64)
+        evaluation.bin_confidence = np.asarray(state["bin_confidence"], dtype=float)
+        evaluation.bin_correct = np.asarray(state["bin_correct"], dtype=np.int64)
+        evaluation.sources = dict(state["sources"])
+        return evaluation
+
+    def report(self):
+        # Laporan lengkap; "state" bisa dimuat lagi dengan from_dict untuk digabung
+        return {
+            "summary": self.summary(),
+            "per_class": self.per_class_frame().to_dict(orient="records"),
+            "calibration": self.calibration_frame().to_dict(orient="records"),
+            "unknown_labels": self.unknown_frame().to_dict(orient="records"),
+            "state": self.to_dict(),
+        }
+
+    def report_json(self):
+        return json.dumps(self.report(), indent=2, ensure_ascii=False, default=float)
+
+    def report_excel(self):
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            summary = pd.DataFrame([self.summary()]).drop(columns="sources")
+            summary.to_excel(writer, sheet_name="Ringkasan", index=False)
+            self.per_class_frame().to_excel(writer, sheet_name="Per Kelas", index=False)
+            self.confusion_frame().to_excel(writer, sheet_name="Confusion Matrix")
+            self.calibration_frame().to_excel(writer, sheet_name="Kalibrasi", index=False)
+            if self.unknown:
+                self.unknown_frame().to_excel(writer, sheet_name="Label Tidak Dikenal", index=False)
+            if self.sources:
+                pd.DataFrame(list(self.sources.items()), columns=["File", "Jumlah Baris"]).to_excel(
+                    writer, sheet_name="Sumber", index=False)
+        return output.getvalue()
+
+
+def evaluate_files(bundle, paths, chunk_rows=None):
+    # Prediksi dan evaluasi file per chunk; hasil prediksi tidak disimpan
+    import bulk
+    from encoder import TARGET_COLUMN
+
+    evaluation = Evaluation(bundle.classes_)
+    for path in paths:
+        with open(path, "rb") as f:
+            _, chunks = bulk.open_chunks(f, path, chunk_rows or bulk.CHUNK_ROWS)
+            for chunk, _, y_pred, proba, _ in bulk.iter_scored(bundle, chunks, with_proba=True):
+                if TARGET_COLUMN not in chunk.columns:
+                    raise ValueError(f"{path}: kolom '{TARGET_COLUMN}' tidak ditemukan")
+                evaluation.update(chunk[TARGET_COLUMN], y_pred, proba, source=path)
+    return evaluation
+
+
+if __name__ == "__main__":
+    from model_store import ModelStore
+
+    parser = argparse.ArgumentParser(description="Evaluasi model pada file berlabel (diproses per chunk)")
+    parser.add_argument("files", nargs="+", help="file .xlsx/.csv/.parquet dengan kolom Kategori Diagnosis")
+    parser.add_argument("--merge", nargs="*", default=[], help="laporan JSON sebelumnya untuk digabung")
+    parser.add_argument("--output", default="laporan_evaluasi.json", help="file laporan (.json atau .xlsx)")
+    args = parser.parse_args()
+
+    bundle = ModelStore().current()
+    evaluation = evaluate_files(bundle, args.files)
+    for path in args.merge:
+        with open(path, encoding="utf-8") as f:
+            evaluation.merge(Evaluation.from_dict(json.load(f)["state"]))
+
+    if args.output.endswith(".xlsx"):
+        with open(args.output, "wb") as f:
+            f.write(evaluation.report_excel())
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(evaluation.report_json())
+    print(evaluation.per_class_frame().to_string())
+    print("Ringkasan:", evaluation.summary())
+    print("Laporan disimpan di", args.output)
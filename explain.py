@@ -0,0 +1,123 @@
+# ====================== PENJELASAN PREDIKSI (MODEL LINEAR) ======================
+# Untuk model linear, kontribusi setiap fitur pada skor sebuah kelas cukup
+# bobot * (x - rata-rata data training) — sama dengan nilai SHAP model linear,
+# tanpa mengevaluasi ulang model. Tabel bobot per kelas dihitung sekali saat
+# training dan disimpan di bundle (MinMaxScaler sudah dilebur ke bobot):
+#
+#   SVC linear (OvO)    skor kelas c = Σ keputusan pasangan (c, j) − Σ keputusan (i, c)
+#   logreg / linear     skor kelas c = coef_[c] · x + intercept_[c]
+#
+# Model non-linear (rbf, lookup) tidak punya tabel bobot; explainer = None.
+import numpy as np
+import pandas as pd
+
+TOP_FACTORS = 3
+FACTOR_COLUMN = "Faktor Utama"
+PROBA_PREFIX = "Prob. "
+
+
+class LinearExplainer:
+    def __init__(self, weights, bias, baseline, feature_names, classes):
+        # weights: (kelas x fitur) pada skala fitur asli (hasil encode, sebelum MinMaxScaler)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.baseline = np.asarray(baseline, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        self.classes = np.asarray(classes)
+        # Skor kelas untuk "pasien rata-rata"; skor = expected + Σ kontribusi
+        self.expected = self.weights @ self.baseline + self.bias
+
+    def contributions(self, X, class_index):
+        # (baris x fitur) kontribusi tiap fitur ke skor kelas class_index (skalar atau per baris)
+        X = np.asarray(X, dtype=np.float64)
+        return self.weights[class_index] * (X - self.baseline)
+
+    def explain_record(self, x, class_index):
+        # Tabel kontribusi satu record, diurutkan dari pengaruh terbesar
+        x = np.asarray(x, dtype=np.float64).ravel()
+        contribution = self.contributions(x, class_index)
+        return pd.DataFrame({
+            "Fitur": self.feature_names,
+            "Nilai": x,
+            "Kontribusi": contribution,
+        }).sort_values("Kontribusi", key=np.abs, ascending=False, ignore_index=True)
+
+    def top_factors(self, X, y_pred, k=TOP_FACTORS):
+        # Teks "Fitur (+0.82), ..." berisi k fitur yang paling mendorong kelas prediksi, per baris
+        contribution = self.contributions(X, np.asarray(y_pred))
+        top = np.argsort(-contribution, axis=1)[:, :k]
+        values = np.take_along_axis(contribution, top, axis=1)
+        names = np.asarray(self.feature_names, dtype=object)[top]
+        parts = [pd.Series(names[:, i]) + " (" + pd.Series(np.char.mod("%+.2f", values[:, i])) + ")"
+                 for i in range(top.shape[1])]
+        return parts[0].str.cat(parts[1:], sep=", ").to_numpy() if len(parts) > 1 else parts[0].to_numpy()
+
+
+def _ovo_class_weights(coef, intercept, n_classes):
+    # Agregasi bobot pasangan OvO (urutan pasangan libsvm) menjadi bobot per kelas
+    weights = np.zeros((n_classes, coef.shape[1]))
+    bias = np.zeros(n_classes)
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+    for p, (i, j) in enumerate(pairs):
+        weights[i] += coef[p]
+        weights[j] -= coef[p]
+        bias[i] += intercept[p]
+        bias[j] -= intercept[p]
+    return weights, bias
+
+
+def _linear_coef(model):
+    # (coef_, intercept_) per kelas; CalibratedClassifierCV dirata-rata atas estimator per fold
+    calibrated = getattr(model, "calibrated_classifiers_", None)
+    if calibrated is not None:
+        estimators = [getattr(c, "estimator", None) or getattr(c, "base_estimator") for c in calibrated]
+        coefs = [_linear_coef(e) for e in estimators]
+        if any(c is None for c in coefs):
+            return None
+        return np.mean([c for c, _ in coefs], axis=0), np.mean([b for _, b in coefs], axis=0)
+    if not hasattr(model, "coef_") or not hasattr(model, "intercept_"):
+        return None
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+    if coef.shape[0] == 1:
+        # Biner: satu vektor log-odds kelas positif, dibagi rata ke dua kelas
+        coef, intercept = np.vstack([-coef, coef]) / 2, np.concatenate([-intercept, intercept]) / 2
+    return coef, intercept
+
+
+def build_explainer(model, scaler, X, used_columns, classes):
+    # Dipanggil saat training; X = data training asli (sebelum SMOTE), untuk baseline
+    n_classes = len(classes)
+    if getattr(model, "kernel", None) == "linear" and hasattr(model, "dual_coef_"):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        intercept = np.asarray(model.intercept_, dtype=np.float64)
+        if n_classes == 2:
+            # Konvensi libsvm (lihat scorer.compile_model)
+            coef, intercept = -coef, -intercept
+        coef, intercept = _ovo_class_weights(coef, intercept, n_classes)
+    elif getattr(model, "kernel", None) is None:
+        linear = _linear_coef(model)
+        if linear is None:
+            return None
+        coef, intercept = linear
+    else:
+        return None
+
+    # Lebur MinMaxScaler: coef · (x * scale_ + min_) = (coef * scale_) · x + coef · min_
+    weights = coef * scaler.scale_
+    bias = coef @ scaler.min_ + intercept
+    baseline = np.asarray(X, dtype=np.float64).mean(axis=0)
+    return LinearExplainer(weights, bias, baseline, used_columns, classes)
+
+
+def explanation_columns(bundle, X, y_pred, proba, dedup=None):
+    # Kolom tambahan prediksi masal: probabilitas per kelas + faktor utama (jika model linear).
+    # dedup: (index, inverse) dari bulk.unique_rows; teks faktor dibuat sekali per baris unik
+    columns = {f"{PROBA_PREFIX}{c}": proba[:, i] for i, c in enumerate(bundle.classes_)}
+    if bundle.explainer is not None:
+        if dedup is None:
+            columns[FACTOR_COLUMN] = bundle.explainer.top_factors(X, y_pred)
+        else:
+            index, inverse = dedup
+            columns[FACTOR_COLUMN] = bundle.explainer.top_factors(X[index], y_pred[index])[inverse]
+    return columns
@@ -0,0 +1,138 @@
+# ====================== CACHE KOLOMNAR DATA TRAINING ======================
+# Parsing .xlsx lewat openpyxl adalah cara paling lambat memuat data tabel.
+# Setiap workbook cukup di-parse sekali; hasilnya disimpan per hash isi file:
+#   artifacts/ingest/<hash>.feather  → tabel mentah (Arrow, dibaca memory-mapped)
+#   artifacts/ingest/<hash>.X.npy    → matriks fitur ter-encode (float32, np.load mmap)
+#   artifacts/ingest/<hash>.y.npy    → label "Kategori Diagnosis"
+#   artifacts/ingest/<hash>.json     → skema kolom fitur
+#
+# Cache dibatasi ukuran total dan umur entri (prune): entri tertua dihapus dulu,
+# sehingga workbook pasien yang diunggah tidak tersimpan di disk tanpa batas.
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from encoder import encode_features, feature_columns, target_labels
+from model_store import ARTIFACT_DIR, atomic_write
+
+INGEST_DIR = os.path.join(ARTIFACT_DIR, "ingest")
+
+# Naikkan jika aturan encoding berubah, agar matriks lama tidak dipakai ulang
+INGEST_VERSION = 2
+
+MAX_CACHE_BYTES = 512 * 2 ** 20
+MAX_CACHE_AGE_SECONDS = 7 * 24 * 60 * 60
+
+
+def cache_key(data):
+    h = hashlib.sha256(data)
+    h.update(f"ingest-{INGEST_VERSION}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _path(key, suffix, directory=INGEST_DIR):
+    return os.path.join(directory, key + suffix)
+
+
+def load_table(data, directory=INGEST_DIR):
+    # Tabel mentah workbook (isi bytes), dari cache Feather jika ada
+    with instrumentation.timer("parse"):
+        return _read_table(data, directory)
+
+
+def _read_table(data, directory):
+    key = cache_key(data)
+    path = _path(key, ".feather", directory)
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return pd.read_excel(io.BytesIO(data))
+
+    if os.path.exists(path):
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    df = pd.read_excel(io.BytesIO(data))
+    try:
+        atomic_write(path, lambda p: feather.write_feather(df.reset_index(drop=True), p))
+    except (TypeError, ValueError) as e:
+        # Kolom bertipe campuran tidak bisa dikonversi ke Arrow; lewati cache
+        print("Tabel tidak di-cache:", e)
+    prune(directory, keep=key)
+    return df
+
+
+def load_encoded(data, directory=INGEST_DIR):
+    # (X, label, kolom fitur) untuk training; X dan label dimuat memory-mapped (zero-copy)
+    key = cache_key(data)
+    x_path, y_path, meta_path = (_path(key, s, directory) for s in (".X.npy", ".y.npy", ".json"))
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                columns = json.load(f)["columns"]
+            return np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"), columns
+        except FileNotFoundError:
+            # Entri sedang dihapus oleh prune; bangun ulang
+            pass
+
+    df = load_table(data, directory)
+    columns = feature_columns(df)
+    labels = target_labels(df)
+    X = encode_features(df, columns)
+
+    atomic_write(x_path, lambda p: _save_npy(p, X))
+    atomic_write(y_path, lambda p: _save_npy(p, labels))
+    # Metadata ditulis terakhir: keberadaannya menandakan cache lengkap
+    atomic_write(meta_path, lambda p: _save_json(p, {"columns": columns, "rows": len(X)}))
+    prune(directory, keep=key)
+    return X, labels, columns
+
+
+def prune(directory=INGEST_DIR, max_bytes=MAX_CACHE_BYTES, max_age=MAX_CACHE_AGE_SECONDS, keep=None):
+    # Hapus entri (semua file dengan hash yang sama) yang kedaluwarsa, lalu yang tertua
+    # sampai total ukuran di bawah max_bytes. Entri `keep` (baru saja ditulis) tidak dihapus.
+    entries = {}
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith("."):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        key = name.split(".", 1)[0]
+        newest, size, paths = entries.get(key, (0, 0, []))
+        entries[key] = (max(newest, st.st_mtime), size + st.st_size, paths + [path])
+
+    now = time.time()
+    total = sum(size for _, size, _ in entries.values())
+    for key, (newest, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+        if key == keep or (now - newest <= max_age and total <= max_bytes):
+            continue
+        # .json duluan: tanpa metadata, entri tidak lagi dianggap lengkap oleh load_encoded
+        for path in sorted(paths, key=lambda p: not p.endswith(".json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+
+def _save_npy(path, array):
+    # Lewat file handle: np.save(path) akan menambahkan ".npy" ke nama file sementara
+    with open(path, "wb") as f:
+        np.save(f, array)
+
+
+def _save_json(path, payload):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
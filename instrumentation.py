@@ -0,0 +1,174 @@
+# ====================== INSTRUMENTASI ======================
+# Timer per tahap (muat model, parse file, encoding, scaling, prediksi, render)
+# dan counter (prediksi, cache hit/miss, training ulang) untuk proses ini.
+#
+#   render()                      → teks format Prometheus (GET /metrics di api.py)
+#   HEPATITIS_METRICS_PORT=9100   → endpoint /metrics untuk aplikasi Streamlit
+#   HEPATITIS_METRICS_LOG=1       → setiap tahap juga ditulis sebagai satu baris log JSON
+#   HEPATITIS_PROFILE=<folder>    → blok profile(...) direkam cProfile ke <folder>/*.prof
+#
+# Untuk py-spy tidak perlu mode khusus: py-spy record --pid <pid> dapat dipasang
+# ke proses streamlit/uvicorn yang sedang berjalan.
+import cProfile
+import contextlib
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "hepatitis_"
+METRICS_PORT_ENV = "HEPATITIS_METRICS_PORT"
+METRICS_LOG_ENV = "HEPATITIS_METRICS_LOG"
+PROFILE_ENV = "HEPATITIS_PROFILE"
+
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+COUNTERS = {
+    "predictions_total": "Jumlah baris yang diprediksi",
+    "prediction_cache_hits_total": "Prediksi manual yang dijawab dari cache",
+    "prediction_cache_misses_total": "Prediksi manual yang harus dihitung model",
+    "retrains_total": "Job training ulang yang selesai, per status",
+}
+HISTOGRAMS = {
+    "stage_seconds": "Durasi tahap pipeline (detik)",
+}
+
+logger = logging.getLogger("hepatitis.metrics")
+if os.environ.get(METRICS_LOG_ENV):
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _label_text(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            buckets, total = self._histograms.get(key, ([0] * len(BUCKETS), [0.0, 0]))
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            total[0] += value
+            total[1] += 1
+            self._histograms[key] = (buckets, total)
+
+    @contextlib.contextmanager
+    def timer(self, stage, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("stage_seconds", elapsed, stage=stage, **labels)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps(dict(event="stage", stage=stage, seconds=round(elapsed, 6), **labels)))
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(b), list(t)) for key, (b, t) in self._histograms.items()}
+        return counters, histograms
+
+    def render(self):
+        counters, histograms = self.snapshot()
+        lines = []
+        for name, help_text in COUNTERS.items():
+            lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} counter"]
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+        for name, help_text in HISTOGRAMS.items():
+            lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} histogram"]
+            for (key_name, labels), (buckets, (total, count)) in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                for bound, n in zip(BUCKETS, buckets):
+                    lines.append(f"{PREFIX}{name}_bucket{_label_text(labels, [('le', bound)])} {n}")
+                lines.append(f"{PREFIX}{name}_bucket{_label_text(labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {total:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+inc = METRICS.inc
+observe = METRICS.observe
+timer = METRICS.timer
+render = METRICS.render
+
+
+# ====================== PROFILING (cProfile) ======================
+_profile_ids = itertools.count()
+_profiling = threading.local()
+
+
+@contextlib.contextmanager
+def profile(name):
+    # Tanpa HEPATITIS_PROFILE (atau jika blok lain di thread ini sedang diprofil) tidak melakukan apa-apa
+    directory = os.environ.get(PROFILE_ENV)
+    if not directory or getattr(_profiling, "active", False):
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    _profiling.active = True
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _profiling.active = False
+        profiler.dump_stats(os.path.join(directory, f"{name}-{os.getpid()}-{next(_profile_ids)}.prof"))
+
+
+# ====================== ENDPOINT /metrics TERPISAH ======================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_http_server_from_env():
+    port = os.environ.get(METRICS_PORT_ENV)
+    if not port:
+        return None
+    return start_http_server(int(port))
@@ -0,0 +1,155 @@
+# ====================== JOB TRAINING DI LATAR BELAKANG ======================
+# Training ulang dari tab "Uji Dengan Data Baru" dijalankan di process pool,
+# bukan di thread sesi Streamlit. Setiap job punya id, status, progres dan bisa
+# dibatalkan; bundle hasilnya disimpan oleh worker lalu dipublikasikan sebagai
+# versi aktif oleh proses utama.
+#
+# Pembatalan job yang sedang berjalan bersifat kooperatif: worker berhenti di
+# awal tahap training berikutnya (fit SVC sendiri tidak bisa diinterupsi).
+import datetime
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentation
+import training
+from model_store import ModelStore
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+STATUS_LABELS = {
+    QUEUED: "Menunggu antrean",
+    RUNNING: "Sedang melatih",
+    DONE: "Selesai",
+    FAILED: "Gagal",
+    CANCELLED: "Dibatalkan",
+}
+
+
+class TrainingCancelled(Exception):
+    pass
+
+
+def _run_job(data, params, source, store_root, state, cancel_event):
+    # Dijalankan di proses worker
+    def on_progress(fraction, message):
+        if cancel_event.is_set():
+            raise TrainingCancelled()
+        state.update(status=RUNNING, progress=fraction, message=message)
+
+    bundle, report = training.train_bytes(data, params, source=source, on_progress=on_progress)
+    ModelStore(store_root).save(bundle)
+    return bundle.version, report["accuracy"]
+
+
+class TrainingJob:
+    def __init__(self, version, params, source, state, cancel_event):
+        self.id = uuid.uuid4().hex[:12]
+        self.version = version
+        self.params = dict(params)
+        self.source = source
+        self.created_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.accuracy = None
+        self.error = None
+        self.future = None
+        self._state = state
+        self._cancel_event = cancel_event
+
+    @property
+    def status(self):
+        return self._state.get("status", QUEUED)
+
+    @property
+    def progress(self):
+        return self._state.get("progress", 0.0)
+
+    @property
+    def message(self):
+        return self._state.get("message", "")
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def _set(self, **values):
+        self._state.update(values)
+
+
+class TrainingJobManager:
+    def __init__(self, store, max_workers=1):
+        self.store = store
+        # "spawn" agar worker tidak mewarisi thread-thread server Streamlit
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, data, params, source=None):
+        version = training.fingerprint(data, params)
+        with self._lock:
+            # Satu job per versi: upload/parameter yang sama tidak dilatih dua kali
+            for job in self._jobs.values():
+                if job.version == version and job.status in (QUEUED, RUNNING, DONE):
+                    return job
+
+            job = TrainingJob(version, params, source, self._manager.dict(), self._manager.Event())
+            self._jobs[job.id] = job
+            if self.store.has_version(version):
+                job._set(status=DONE, progress=1.0, message="Model sudah pernah dilatih")
+                return job
+
+            job._set(status=QUEUED, progress=0.0, message="")
+            job.future = self._executor.submit(
+                _run_job, data, params, source, self.store.root, job._state, job._cancel_event
+            )
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        if future.cancelled():
+            job._set(status=CANCELLED, message="")
+        elif isinstance(future.exception(), TrainingCancelled):
+            job._set(status=CANCELLED, message="")
+        elif future.exception() is not None:
+            job.error = str(future.exception())
+            job._set(status=FAILED, message=job.error)
+        else:
+            try:
+                _, job.accuracy = future.result()
+                # Publikasikan versi baru; sesi lain akan memakainya pada rerun berikutnya
+                self.store.publish(self.store.get(job.version))
+            except Exception as e:
+                # Callback Future menelan exception; tanpa ini job tertahan RUNNING selamanya
+                job.error = f"Gagal mempublikasikan model: {e}"
+                job._set(status=FAILED, message=job.error)
+            else:
+                job._set(status=DONE, progress=1.0, message="Model dipublikasikan")
+        instrumentation.inc("retrains_total", status=job.status)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or not job.active:
+            return False
+        job._cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job._set(status=CANCELLED, message="")
+        return True
+
+    def jobs(self):
+        return list(self._jobs.values())
+
+    def shutdown(self):
+        # Job yang sedang berjalan berhenti di tahap berikutnya; tunggu sebelum manager ditutup
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
+        self._manager.shutdown()
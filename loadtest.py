@@ -0,0 +1,205 @@
+# ====================== LOAD TEST MULTI-SESI ======================
+# Mensimulasikan N sesi Streamlit yang berjalan bersamaan dalam satu proses
+# (Streamlit menjalankan script tiap sesi di thread sendiri) dan memakai satu
+# ModelStore bersama: prediksi manual (encode_record + predict + predict_proba)
+# dan prediksi masal (bulk.score_chunks), sementara thread lain mempublikasikan
+# versi model baru secara berkala. Setiap sesi dipin ke satu versi seperti di
+# app_new.py; hasilnya dicek konsisten dengan versi yang dipin.
+#
+#   python loadtest.py --sessions 8 16 32 --duration 20 --output loadtest.json
+#
+# Model dilatih dari data sintetis (skema sama dengan benchmark.py) ke folder
+# sementara, sehingga artifacts/ produksi tidak tersentuh. Throughput per
+# jumlah sesi dipakai untuk menentukan ukuran pod.
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import bulk
+import instrumentation
+import training
+from benchmark import synthetic_table
+from encoder import FEATURE_COLUMNS, TARGET_COLUMN, encode_features, encode_record
+from model_store import ModelStore
+
+
+def train_versions(store, n_versions, fit_rows):
+    # Versi berbeda = data sintetis dengan seed berbeda
+    versions = []
+    for seed in range(n_versions):
+        df = synthetic_table(fit_rows, seed=seed)
+        X = encode_features(df, FEATURE_COLUMNS)
+        bundle, _ = training.train_encoded(X, df[TARGET_COLUMN], FEATURE_COLUMNS, training.HYPERPARAMS,
+                                           version=f"load-{seed}")
+        store.save(bundle)
+        versions.append(bundle.version)
+    store.publish(store.get(versions[0]))
+    return versions
+
+
+class Session(threading.Thread):
+    def __init__(self, store, records, bulk_table, bulk_ratio, repin_ratio, stop_event, seed):
+        super().__init__(daemon=True)
+        self.store = store
+        self.records = records
+        self.bulk_table = bulk_table
+        self.bulk_ratio = bulk_ratio
+        self.repin_ratio = repin_ratio
+        self.stop_event = stop_event
+        self.rng = random.Random(seed)
+        self.latencies = {"manual": [], "bulk": []}
+        self.bulk_rows = 0
+        self.errors = []
+        self.versions = set()
+
+    def run(self):
+        # Sama seperti sesi baru: pin ke versi aktif saat sesi dimulai
+        pinned = self.store.current().version
+        while not self.stop_event.is_set():
+            if self.rng.random() < self.repin_ratio:
+                # Pengguna menekan "Gunakan Versi Terbaru"
+                pinned = self.store.current().version
+            kind = "bulk" if self.rng.random() < self.bulk_ratio else "manual"
+            start = time.perf_counter()
+            try:
+                bundle = self.store.get(pinned)
+                if bundle.version != pinned:
+                    raise RuntimeError(f"versi {bundle.version} != versi dipin {pinned}")
+                if kind == "manual":
+                    x = encode_record(self.rng.choice(self.records), bundle.used_columns)
+                    bundle.predict(x)
+                    bundle.predict_proba(x)
+                else:
+                    result = bulk.score_chunks(bundle, [self.bulk_table.copy()])
+                    if result.n_rows != len(self.bulk_table):
+                        raise RuntimeError(f"{result.n_rows} baris diprediksi dari {len(self.bulk_table)}")
+                    self.bulk_rows += result.n_rows
+            except Exception as e:
+                self.errors.append(f"{kind}: {type(e).__name__}: {e}")
+                continue
+            self.latencies[kind].append(time.perf_counter() - start)
+            self.versions.add(pinned)
+
+
+def publisher(store, versions, interval, stop_event, published):
+    # Training ulang yang selesai di tengah beban: versi aktif digilir
+    i = 0
+    while not stop_event.wait(interval):
+        i = (i + 1) % len(versions)
+        store.publish(store.get(versions[i]))
+        published.append(versions[i])
+
+
+def latency_summary(timings, duration):
+    if not timings:
+        return {"count": 0}
+    timings = np.asarray(timings)
+    return {
+        "count": len(timings),
+        "per_second": len(timings) / duration,
+        "p50_ms": float(np.percentile(timings, 50) * 1e3),
+        "p99_ms": float(np.percentile(timings, 99) * 1e3),
+        "max_ms": float(timings.max() * 1e3),
+    }
+
+
+def model_loads():
+    # Jumlah bundle yang dimuat dari disk (timer "model_load", lihat model_store.py)
+    _, histograms = instrumentation.METRICS.snapshot()
+    return sum(total[1] for (name, labels), (_, total) in histograms.items()
+               if name == "stage_seconds" and ("stage", "model_load") in labels)
+
+
+def run_load(store, versions, n_sessions, duration, records, bulk_table, bulk_ratio, repin_ratio,
+             publish_interval):
+    stop_event = threading.Event()
+    published = []
+    sessions = [Session(store, records, bulk_table, bulk_ratio, repin_ratio, stop_event, seed=i)
+                for i in range(n_sessions)]
+    pub = threading.Thread(target=publisher, args=(store, versions, publish_interval, stop_event, published),
+                           daemon=True)
+
+    loads_before = model_loads()
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+    pub.start()
+    time.sleep(duration)
+    stop_event.set()
+    for session in sessions:
+        session.join()
+    pub.join()
+    elapsed = time.perf_counter() - start
+
+    errors = [e for s in sessions for e in s.errors]
+    return {
+        "sessions": n_sessions,
+        "duration_s": elapsed,
+        "manual": latency_summary([t for s in sessions for t in s.latencies["manual"]], elapsed),
+        "bulk": latency_summary([t for s in sessions for t in s.latencies["bulk"]], elapsed),
+        "bulk_rows_per_second": sum(s.bulk_rows for s in sessions) / elapsed,
+        "publishes": len(published),
+        "model_loads": model_loads() - loads_before,
+        "versions_used": sorted(set().union(*(s.versions for s in sessions))),
+        "loaded_versions": store.loaded_versions(),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test multi-sesi untuk prediksi manual dan masal")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16], help="jumlah sesi bersamaan")
+    parser.add_argument("--duration", type=float, default=10.0, help="detik per jumlah sesi")
+    parser.add_argument("--bulk-rows", type=int, default=5000, help="baris per prediksi masal")
+    parser.add_argument("--bulk-ratio", type=float, default=0.1, help="porsi permintaan yang berupa prediksi masal")
+    parser.add_argument("--repin-ratio", type=float, default=0.01, help="peluang sesi pindah ke versi terbaru")
+    parser.add_argument("--publish-interval", type=float, default=2.0, help="detik antar publikasi versi baru")
+    parser.add_argument("--versions", type=int, default=2, help="jumlah versi model yang digilir")
+    parser.add_argument("--fit-rows", type=int, default=2000, help="baris data sintetis untuk melatih tiap versi")
+    parser.add_argument("--output", default="loadtest.json")
+    args = parser.parse_args(argv)
+
+    bulk_table = synthetic_table(args.bulk_rows, seed=100)
+    records = synthetic_table(500, seed=101).drop(columns=[TARGET_COLUMN]).to_dict(orient="records")
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as root:
+        store = ModelStore(root)
+        print("Melatih", args.versions, "versi model...")
+        versions = train_versions(store, args.versions, args.fit_rows)
+        for n_sessions in args.sessions:
+            result = run_load(store, versions, n_sessions, args.duration, records, bulk_table, args.bulk_ratio,
+                              args.repin_ratio, args.publish_interval)
+            report["results"].append(result)
+            print(f"{n_sessions:>4} sesi: manual {result['manual'].get('per_second', 0):8.1f}/s "
+                  f"p99 {result['manual'].get('p99_ms', 0):7.2f} ms | masal "
+                  f"{result['bulk_rows_per_second']:10.0f} baris/s p99 {result['bulk'].get('p99_ms', 0):8.1f} ms"
+                  f" | publikasi {result['publishes']} | muat {result['model_loads']} | error {result['errors']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print("Hasil load test disimpan di", args.output)
+    if any(r["errors"] for r in report["results"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
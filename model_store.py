@@ -0,0 +1,223 @@
+# ====================== PENYIMPANAN MODEL (BUNDLE) ======================
+# Model, encoder, scaler, skema kolom dan metadata disimpan dalam satu file
+# bundle per versi: artifacts/bundles/<versi>.joblib. File artifacts/CURRENT
+# menunjuk versi yang aktif. Semua penulisan memakai file sementara + os.replace
+# sehingga pembaca tidak pernah melihat bundle atau pointer setengah jadi.
+#
+# Di dalam proses, ModelStore adalah registry bersama untuk semua sesi: setiap
+# versi dimuat sekali, dan daftar versi yang dimuat (dict versi → bundle) tidak
+# pernah diubah di tempat. Penulis membuat salinan baru di bawah lock lalu
+# menukar referensinya (read-copy-update), sehingga pembaca tidak perlu lock.
+import os
+import tempfile
+import threading
+
+import joblib
+
+import instrumentation
+
+ARTIFACT_DIR = "artifacts"
+BUNDLE_SUBDIR = "bundles"
+CURRENT_FILE = "CURRENT"
+# Jumlah versi yang tetap dimuat (termasuk versi aktif), untuk sesi yang masih memakai versi lama
+MAX_LOADED_VERSIONS = 3
+
+
+class ModelBundle:
+    def __init__(self, model, label_encoder, scaler, used_columns, metadata, scorer=None, explainer=None):
+        self.model = model
+        self.label_encoder = label_encoder
+        self.scaler = scaler
+        self.used_columns = list(used_columns)
+        self.metadata = dict(metadata)
+        # CompiledScorer (lihat scorer.py); None jika model tidak bisa dikompilasi
+        self.scorer = scorer
+        # LinearExplainer (lihat explain.py); None untuk model non-linear atau bundle lama
+        self.explainer = explainer
+
+    @property
+    def version(self):
+        return self.metadata["version"]
+
+    @property
+    def classes_(self):
+        return self.label_encoder.classes_
+
+    def _scale(self, X):
+        with instrumentation.timer("scale"):
+            return self.scaler.transform(X)
+
+    def predict(self, X):
+        with instrumentation.timer("predict"):
+            if self.scorer is not None:
+                return self.scorer.predict(X)
+            return self.model.predict(self._scale(X))
+
+    def predict_proba(self, X):
+        with instrumentation.timer("predict_proba"):
+            if self.scorer is not None and self.scorer.has_proba:
+                return self.scorer.predict_proba(X)
+            return self.model.predict_proba(self._scale(X))
+
+    def predict_labels(self, X):
+        return self.label_encoder.inverse_transform(self.predict(X))
+
+    def to_dict(self):
+        return {
+            "model": self.model,
+            "label_encoder": self.label_encoder,
+            "scaler": self.scaler,
+            "used_columns": self.used_columns,
+            "metadata": self.metadata,
+            "scorer": self.scorer,
+            "explainer": self.explainer,
+        }
+
+
+def atomic_write(path, write):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelStore:
+    def __init__(self, root=ARTIFACT_DIR, max_loaded=MAX_LOADED_VERSIONS):
+        self.root = root
+        self.max_loaded = max_loaded
+        self._lock = threading.Lock()
+        self._bundle = None
+        # Snapshot immutable versi → bundle; hanya diganti utuh di bawah self._lock
+        self._loaded = {}
+        self._pointer_stat = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        # callback(versi) dipanggil setiap kali versi aktif di proses ini berganti
+        self._listeners.append(callback)
+
+    def _notify(self, version):
+        for callback in list(self._listeners):
+            callback(version)
+
+    @property
+    def current_path(self):
+        return os.path.join(self.root, CURRENT_FILE)
+
+    def bundle_path(self, version):
+        return os.path.join(self.root, BUNDLE_SUBDIR, f"{version}.joblib")
+
+    def has_version(self, version):
+        return os.path.exists(self.bundle_path(version))
+
+    def current_version(self):
+        try:
+            with open(self.current_path, encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(self, bundle):
+        # Tanpa kompresi agar array numpy bisa di-memory-map saat dimuat
+        atomic_write(self.bundle_path(bundle.version), lambda p: joblib.dump(bundle.to_dict(), p))
+
+    def publish(self, bundle):
+        # Simpan bundle dulu, baru pindahkan pointer CURRENT ke versi baru
+        if not self.has_version(bundle.version):
+            self.save(bundle)
+
+        def write_pointer(p):
+            with open(p, "w", encoding="utf-8") as f:
+                f.write(bundle.version)
+
+        # Pointer di disk dan bundle di memori diganti dalam satu langkah di bawah lock,
+        # sehingga publish yang bersamaan (job selesai + tab Uji) tidak bisa bersilang.
+        # Versi dibaca ulang dari pointer: jika proses lain menulis pointer di antaranya,
+        # proses ini memakai versi yang benar-benar ditunjuk pointer.
+        with self._lock:
+            atomic_write(self.current_path, write_pointer)
+            pointer_stat = self._stat_pointer()
+            version = self.current_version()
+            if version != bundle.version:
+                bundle = self._loaded.get(version) or self.load(version)
+            self._remember(bundle)
+            self._bundle = bundle
+            self._pointer_stat = pointer_stat
+        self._notify(bundle.version)
+        return bundle
+
+    def load(self, version):
+        # mmap_mode="c" (copy-on-write): halaman array dibagi antar proses, tetapi
+        # tetap writable sehingga aman untuk routine Cython libsvm
+        with instrumentation.timer("model_load"):
+            return ModelBundle(**joblib.load(self.bundle_path(version), mmap_mode="c"))
+
+    def _remember(self, bundle):
+        # Dipanggil dengan self._lock: salin, tambahkan, buang versi terlama, lalu tukar referensi
+        loaded = dict(self._loaded)
+        loaded.pop(bundle.version, None)
+        loaded[bundle.version] = bundle
+        keep = self._bundle.version if self._bundle is not None else None
+        for version in list(loaded):
+            if len(loaded) <= self.max_loaded:
+                break
+            if version not in (keep, bundle.version):
+                del loaded[version]
+        self._loaded = loaded
+
+    def loaded_versions(self):
+        return list(self._loaded)
+
+    def get(self, version):
+        # Versi tertentu (mis. yang dipin oleh sebuah sesi); dimuat sekali per proses
+        bundle = self._loaded.get(version)
+        if bundle is not None:
+            return bundle
+        with self._lock:
+            bundle = self._loaded.get(version)
+            if bundle is None:
+                bundle = self.load(version)
+                self._remember(bundle)
+            return bundle
+
+    def _stat_pointer(self):
+        try:
+            st = os.stat(self.current_path)
+        except FileNotFoundError:
+            return None
+        # os.replace selalu memberi inode baru, sehingga penggantian pointer dalam
+        # tick timestamp yang sama tetap terdeteksi (ukuran versi selalu sama)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def current(self):
+        # Hanya os.stat per panggilan; bundle dimuat ulang saat pointer berubah
+        pointer_stat = self._stat_pointer()
+        bundle = self._bundle
+        if bundle is not None and pointer_stat == self._pointer_stat:
+            return bundle
+
+        changed = False
+        with self._lock:
+            if self._bundle is not None and pointer_stat == self._pointer_stat:
+                return self._bundle
+            version = self.current_version()
+            if version is None:
+                return None
+            if self._bundle is None or self._bundle.version != version:
+                # Versi baru dipublikasikan oleh proses lain
+                bundle = self._loaded.get(version) or self.load(version)
+                self._remember(bundle)
+                self._bundle = bundle
+                changed = True
+            self._pointer_stat = pointer_stat
+            bundle = self._bundle
+        if changed:
+            self._notify(bundle.version)
+        return bundle
@@ -0,0 +1,77 @@
+# ====================== CACHE PREDIKSI MANUAL ======================
+# Ruang input manual kecil (14 gejala biner, JK, Umur 0-90) dan sering berulang,
+# jadi hasil prediksi disimpan per (versi model, vektor fitur ter-encode).
+# Cache dibatasi jumlah entri (LRU) dan umur entri (TTL), dan dikosongkan saat
+# versi model berganti.
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+
+MAX_ENTRIES = 4096
+TTL_SECONDS = 60 * 60
+
+
+class PredictionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrumentation.inc("prediction_cache_hits_total")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            instrumentation.inc("prediction_cache_misses_total")
+            return None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def predict(self, bundle, X):
+        # X: matriks 1 x n hasil encode_record; mengembalikan (indeks kelas, probabilitas)
+        key = (bundle.version, tuple(X[0].tolist()))
+        value = self._get(key)
+        if value is None:
+            probas = bundle.predict_proba(X)[0]
+            probas.setflags(write=False)
+            value = (int(bundle.predict(X)[0]), probas)
+            self._put(key, value)
+        return value
+
+    def invalidate(self, version=None):
+        # Tanpa argumen: kosongkan semua; dengan versi: hanya entri versi lain yang dibuang
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] != version]:
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,156 @@
+# ====================== SCORER LINEAR TERKOMPILASI ======================
+# Untuk SVC(kernel='linear'), prediksi cukup berupa perkalian matriks kecil:
+# MinMaxScaler dilebur ke bobot coef_ (W' = coef_ * scale_, b' = coef_ @ min_ + b),
+# lalu voting one-vs-one dan probabilitas Platt + pairwise coupling seperti libsvm.
+# Semuanya NumPy murni, tanpa overhead validasi sklearn/libsvm per panggilan.
+import numpy as np
+
+# Konstanta dari libsvm (svm_predict_probability / multiclass_probability)
+MIN_PROB = 1e-7
+
+# Di bawah jumlah baris ini, coupling dihitung dengan loop Python biasa:
+# untuk k=4 kelas jauh lebih cepat daripada puluhan operasi NumPy kecil
+SMALL_BATCH = 8
+
+
+class CompiledScorer:
+    def __init__(self, weights, bias, pairs, n_classes, prob_a=None, prob_b=None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.pairs = np.asarray(pairs, dtype=np.intp)
+        self.n_classes = int(n_classes)
+        self.prob_a = None if prob_a is None else np.asarray(prob_a, dtype=np.float64)
+        self.prob_b = None if prob_b is None else np.asarray(prob_b, dtype=np.float64)
+
+        # Tabel voting OvO: kolom pertama untuk dec > 0 (kelas i), kedua untuk dec <= 0 (kelas j)
+        n_pairs = len(self.pairs)
+        self.vote_win = np.zeros((n_pairs, self.n_classes), dtype=np.float64)
+        self.vote_lose = np.zeros((n_pairs, self.n_classes), dtype=np.float64)
+        self.vote_win[np.arange(n_pairs), self.pairs[:, 0]] = 1
+        self.vote_lose[np.arange(n_pairs), self.pairs[:, 1]] = 1
+
+    @property
+    def has_proba(self):
+        return self.prob_a is not None
+
+    def decision_function(self, X):
+        # Nilai keputusan per pasangan kelas, dengan konvensi tanda libsvm
+        return np.asarray(X, dtype=np.float64) @ self.weights.T + self.bias
+
+    def _votes(self, dec):
+        win = (dec > 0).astype(np.float64)
+        return win @ self.vote_win + (1.0 - win) @ self.vote_lose
+
+    def predict(self, X):
+        # np.argmax memilih indeks terkecil saat seri, sama seperti libsvm
+        return np.argmax(self._votes(self.decision_function(X)), axis=1)
+
+    def predict_proba(self, X):
+        if not self.has_proba:
+            raise ValueError("Model dilatih tanpa probability=True")
+        dec = self.decision_function(X)
+
+        # Sigmoid Platt per pasangan: r_ij = 1 / (1 + exp(A * dec + B))
+        r = np.exp(-np.logaddexp(0.0, dec * self.prob_a + self.prob_b))
+        r = np.clip(r, MIN_PROB, 1 - MIN_PROB)
+
+        n, k = len(dec), self.n_classes
+        R = np.zeros((n, k, k))
+        i, j = self.pairs[:, 0], self.pairs[:, 1]
+        R[:, i, j] = r
+        R[:, j, i] = 1 - r
+        if n <= SMALL_BATCH:
+            return np.array([_multiclass_probability_row(row.tolist()) for row in R])
+        return _multiclass_probability(R)
+
+
+def _multiclass_probability(R):
+    # Pairwise coupling (Wu, Lin & Weng 2004) versi libsvm, divektorisasi per baris.
+    # Baris yang sudah konvergen dibekukan agar hasilnya identik dengan libsvm.
+    n, k, _ = R.shape
+    Q = -R.transpose(0, 2, 1) * R
+    Q[:, np.arange(k), np.arange(k)] = (R ** 2).sum(axis=1)
+
+    p = np.full((n, k), 1.0 / k)
+    eps = 0.005 / k
+    active = np.arange(n)
+    for _ in range(max(100, k)):
+        if not active.size:
+            break
+        Qa, pa = Q[active], p[active]
+        Qp = np.einsum("ntj,nj->nt", Qa, pa)
+        pQp = (pa * Qp).sum(axis=1)
+        pending = np.abs(Qp - pQp[:, None]).max(axis=1) >= eps
+        active, Qa, pa, Qp, pQp = active[pending], Qa[pending], pa[pending], Qp[pending], pQp[pending]
+
+        for t in range(k):
+            diff = (pQp - Qp[:, t]) / Qa[:, t, t]
+            pa[:, t] += diff
+            pQp = (pQp + diff * (diff * Qa[:, t, t] + 2 * Qp[:, t])) / (1 + diff) ** 2
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1 + diff)[:, None]
+            pa /= (1 + diff)[:, None]
+        p[active] = pa
+    return p
+
+
+def _multiclass_probability_row(r):
+    # Sama dengan _multiclass_probability untuk satu baris (r: list k x k)
+    k = len(r)
+    Q = [[r[t][t2] for t2 in range(k)] for t in range(k)]
+    for t in range(k):
+        Q[t][t] = sum(r[j][t] * r[j][t] for j in range(k) if j != t)
+        for j in range(k):
+            if j != t:
+                Q[t][j] = -r[j][t] * r[t][j]
+
+    p = [1.0 / k] * k
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qp = [sum(Q[t][j] * p[j] for j in range(k)) for t in range(k)]
+        pQp = sum(p[t] * Qp[t] for t in range(k))
+        if max(abs(Qp[t] - pQp) for t in range(k)) < eps:
+            break
+        for t in range(k):
+            diff = (pQp - Qp[t]) / Q[t][t]
+            p[t] += diff
+            pQp = (pQp + diff * (diff * Q[t][t] + 2 * Qp[t])) / (1 + diff) / (1 + diff)
+            for j in range(k):
+                Qp[j] = (Qp[j] + diff * Q[t][j]) / (1 + diff)
+                p[j] /= (1 + diff)
+    return p
+
+
+def compile_model(model, scaler):
+    # Hanya SVC linear yang bisa dikompilasi; model lain mengembalikan None
+    if getattr(model, "kernel", None) != "linear" or not hasattr(model, "dual_coef_"):
+        return None
+
+    n_classes = len(model.classes_)
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    if n_classes == 2:
+        # sklearn membalik tanda coef_/intercept_ untuk kasus biner; kembalikan ke konvensi libsvm
+        coef, intercept = -coef, -intercept
+
+    weights = coef * scaler.scale_
+    bias = coef @ scaler.min_ + intercept
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+
+    prob_a = prob_b = None
+    if getattr(model, "probability", False):
+        prob_a, prob_b = model.probA_, model.probB_
+    return CompiledScorer(weights, bias, pairs, n_classes, prob_a, prob_b)
+
+
+def check_parity(scorer, model, scaler, X, atol=1e-6):
+    # Bandingkan dengan model.predict / predict_proba; mengembalikan daftar ketidaksesuaian
+    X_scaled = scaler.transform(X)
+    problems = []
+    mismatch = int((scorer.predict(X) != model.predict(X_scaled)).sum())
+    if mismatch:
+        problems.append(f"{mismatch} prediksi berbeda")
+    if scorer.has_proba:
+        max_diff = float(np.abs(scorer.predict_proba(X) - model.predict_proba(X_scaled)).max())
+        if max_diff > atol:
+            problems.append(f"selisih probabilitas maksimum {max_diff:.2e}")
+    return problems
@@ -0,0 +1,201 @@
+# ====================== PENCARIAN HYPERPARAMETER ======================
+# Stratified k-fold atas kombinasi C, kernel, class_weight dan SMOTE on/off.
+# SMOTE dan MinMaxScaler hanya di-fit pada data latih tiap fold, sehingga
+# akurasi yang dilaporkan jujur (tidak dievaluasi pada data training sendiri).
+# Setiap (kandidat, fold) dijalankan paralel di process pool, hasilnya di-cache
+# dengan joblib.Memory, dan pencarian berhenti saat batas waktu tercapai.
+#
+#   python search.py --folds 5 --time-budget 600
+import argparse
+import itertools
+import json
+import os
+import pickle
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+from joblib import Memory
+from imblearn.over_sampling import SMOTE
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from backends import DEFAULT_BACKEND, make_model
+import ingest
+from model_store import ARTIFACT_DIR
+
+SEARCH_DIR = os.path.join(ARTIFACT_DIR, "search")
+
+PARAM_GRID = {
+    "kernel": ["linear", "rbf"],
+    "C": [0.1, 1.0, 10.0, 100.0],
+    "class_weight": [None, "balanced"],
+    "smote": [True, False],
+}
+
+# Kolom leaderboard yang bukan hasil pengukuran (dipakai untuk merekonstruksi parameter)
+SCORE_COLUMNS = {"folds_done", "complete", "accuracy_mean", "accuracy_std", "f1_macro_mean",
+                 "fit_time_mean", "predict_us_per_row", "fit_peak_mb", "model_kb"}
+
+
+def grid_for(backend, grid=PARAM_GRID):
+    # Grid untuk backend tertentu; kernel hanya berlaku untuk SVC, dan SGD tidak memakai C
+    grid = dict(grid, backend=[backend])
+    if backend != "svc":
+        grid.pop("kernel", None)
+    if backend == "sgd":
+        grid.pop("C", None)
+    return grid
+
+
+def candidates(grid=PARAM_GRID):
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _fit_fold(X, y, train_idx, test_idx, params, random_state):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X_train, y_train = X[train_idx], y[train_idx]
+    if params["smote"]:
+        X_train, y_train = SMOTE(random_state=random_state).fit_resample(X_train, y_train)
+    scaler = MinMaxScaler().fit(X_train)
+    model_params = dict(params, random_state=random_state)
+    if model_params.get("backend", DEFAULT_BACKEND) == "svc":
+        # Default probability=False: predict SVC identik, tanpa biaya kalibrasi Platt internal.
+        # Backend lain tetap dikalibrasi, karena predict model final = argmax probabilitas terkalibrasi
+        model_params.setdefault("probability", False)
+    model = make_model(model_params)
+    model.fit(scaler.transform(X_train), y_train)
+    fit_time = time.perf_counter() - start
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    y_pred = model.predict(scaler.transform(X[test_idx]))
+    predict_time = time.perf_counter() - start
+
+    y_test = y[test_idx]
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "f1_macro": f1_score(y_test, y_pred, average="macro"),
+        "fit_time": fit_time,
+        "predict_time": predict_time,
+        "predict_rows": len(test_idx),
+        "fit_peak_mb": fit_peak / 2 ** 20,
+        "model_kb": len(pickle.dumps(model)) / 1024,
+    }
+
+
+def _run_task(cache_dir, X, y, train_idx, test_idx, params, random_state):
+    # Fold yang pernah dihitung (data + parameter sama) diambil dari cache disk
+    fit_fold = Memory(cache_dir, verbose=0).cache(_fit_fold)
+    return fit_fold(X, y, train_idx, test_idx, params, random_state)
+
+
+def load_training_data(path):
+    with open(path, "rb") as f:
+        X, labels, _ = ingest.load_encoded(f.read())
+    return np.asarray(X), LabelEncoder().fit_transform(labels)
+
+
+def run_search(X, y, grid=PARAM_GRID, n_folds=5, time_budget=None, n_jobs=None, random_state=42,
+               cache_dir=os.path.join(SEARCH_DIR, "cache")):
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X, y))
+    params_list = candidates(grid)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    results = {i: [] for i in range(len(params_list))}
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        # Urut per kandidat, agar kandidat yang selesai duluan punya semua fold-nya
+        pending = {
+            executor.submit(_run_task, cache_dir, X, y, train_idx, test_idx, params, random_state): i
+            for i, params in enumerate(params_list)
+            for train_idx, test_idx in folds
+        }
+        while pending:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Batas waktu habis: batalkan task yang belum mulai; yang sedang berjalan ditunggu
+                for future in pending:
+                    future.cancel()
+                done, _ = wait(pending)
+            for future in done:
+                i = pending.pop(future)
+                if not future.cancelled():
+                    results[i].append(future.result())
+
+    return leaderboard(params_list, results, n_folds)
+
+
+def leaderboard(params_list, results, n_folds):
+    rows = []
+    for i, params in enumerate(params_list):
+        scores = results[i]
+        if not scores:
+            continue
+        accuracy = [s["accuracy"] for s in scores]
+        rows.append(dict(
+            params,
+            folds_done=len(scores),
+            complete=len(scores) == n_folds,
+            accuracy_mean=float(np.mean(accuracy)),
+            accuracy_std=float(np.std(accuracy)),
+            f1_macro_mean=float(np.mean([s["f1_macro"] for s in scores])),
+            fit_time_mean=float(np.mean([s["fit_time"] for s in scores])),
+            predict_us_per_row=1e6 * sum(s["predict_time"] for s in scores) / sum(s["predict_rows"] for s in scores),
+            fit_peak_mb=float(np.max([s["fit_peak_mb"] for s in scores])),
+            model_kb=float(np.mean([s["model_kb"] for s in scores])),
+        ))
+    board = pd.DataFrame(rows)
+    if board.empty:
+        return board
+    return board.sort_values(["complete", "accuracy_mean", "f1_macro_mean", "fit_time_mean"],
+                             ascending=[False, False, False, True], ignore_index=True)
+
+
+def best_params(board):
+    # Kandidat teratas yang semua fold-nya selesai
+    complete = board[board["complete"]]
+    if complete.empty:
+        return None
+    row = complete.iloc[0]
+    params = {key: row[key] for key in board.columns if key not in SCORE_COLUMNS}
+    if "C" in params:
+        params["C"] = float(params["C"])
+    params["smote"] = bool(params["smote"])
+    if pd.isna(params["class_weight"]):
+        params["class_weight"] = None
+    return params, float(row["accuracy_mean"])
+
+
+def save_leaderboard(board, directory=SEARCH_DIR):
+    os.makedirs(directory, exist_ok=True)
+    board.to_csv(os.path.join(directory, "leaderboard.csv"), index=False)
+    with open(os.path.join(directory, "leaderboard.json"), "w", encoding="utf-8") as f:
+        json.dump(board.to_dict(orient="records"), f, indent=2)
+    return directory
+
+
+def add_arguments(parser):
+    parser.add_argument("--folds", type=int, default=5, help="jumlah fold stratified k-fold")
+    parser.add_argument("--time-budget", type=float, default=None, help="batas waktu pencarian (detik)")
+    parser.add_argument("--jobs", type=int, default=None, help="jumlah proses paralel (default: semua core)")
+
+
+if __name__ == "__main__":
+    from training import TRAINING_FILE
+
+    parser = argparse.ArgumentParser(description="Pencarian hyperparameter SVM dengan stratified k-fold")
+    parser.add_argument("--data", default=TRAINING_FILE)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    X, y = load_training_data(args.data)
+    board = run_search(X, y, n_folds=args.folds, time_budget=args.time_budget, n_jobs=args.jobs)
+    print(board.to_string())
+    print("Leaderboard disimpan di", save_leaderboard(board))
@@ -0,0 +1,192 @@
+# ====================== PIPELINE TRAINING MODEL ======================
+# Training dijalankan sekali (python training.py) atau otomatis saat artefak
+# untuk kombinasi dataset + hyperparameter yang sama belum ada.
+#
+# Modul ini diimpor oleh aplikasi Streamlit dan API; sklearn, imblearn dan modul
+# pencarian baru diimpor di dalam fungsi training, sehingga proses yang hanya
+# memuat bundle yang sudah ada tidak membayar biaya impor dependensi training.
+import argparse
+import datetime
+import hashlib
+import json
+from importlib.metadata import version as package_version
+
+import ingest
+from encoder import encode_features, feature_columns, target_labels
+from model_store import ModelBundle, ModelStore
+
+TRAINING_FILE = "Data Training Hepatitis.xlsx"
+
+# Naikkan jika cara training/encoding berubah, agar bundle lama tidak dipakai ulang
+PIPELINE_VERSION = 4
+
+HYPERPARAMS = {
+    "backend": "svc",
+    "kernel": "linear",
+    "C": 1.0,
+    "probability": True,
+    "random_state": 42,
+    "smote": True,
+}
+
+
+def sklearn_version():
+    # Sama dengan sklearn.__version__, tanpa mengimpor sklearn
+    return package_version("scikit-learn")
+
+
+def fingerprint(data, params=HYPERPARAMS):
+    # Hash isi workbook + hyperparameter (+ versi sklearn, karena pickle tidak portabel antar versi).
+    # Hasilnya dipakai sebagai versi bundle model.
+    h = hashlib.sha256(data)
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    h.update(f"{PIPELINE_VERSION}/{sklearn_version()}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def train(df, params=HYPERPARAMS, version=None, source=None, on_progress=None):
+    # Encode fitur (JK, Umur, Ya/Tidak) dalam satu pass vektorisasi
+    used_columns = feature_columns(df)
+    return train_encoded(encode_features(df, used_columns), target_labels(df), used_columns, params,
+                         version=version, source=source, on_progress=on_progress)
+
+
+def train_encoded(X, labels, used_columns, params=HYPERPARAMS, version=None, source=None, on_progress=None):
+    # on_progress(fraksi, pesan) dipanggil di awal tiap tahap; boleh melempar exception untuk membatalkan
+    from imblearn.over_sampling import SMOTE
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+    from backends import make_model
+    from explain import build_explainer
+    from scorer import check_parity, compile_model
+
+    def progress(fraction, message):
+        if on_progress is not None:
+            on_progress(fraction, message)
+
+    # 1. Label encoding untuk target
+    progress(0.05, "Label encoding")
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(labels)
+
+    # 2. SMOTE (duluan, pakai data mentah)
+    X_resampled, y_resampled = X, y
+    if params.get("smote", True):
+        progress(0.15, "SMOTE")
+        smote = SMOTE(random_state=params.get("random_state"))
+        X_resampled, y_resampled = smote.fit_resample(X, y)
+
+    # 3. Normalisasi (setelah SMOTE)
+    progress(0.25, "Normalisasi")
+    scaler = MinMaxScaler()
+    X_resampled_scaled = scaler.fit_transform(X_resampled)
+
+    # 4. Latih model (default SVM; backend lain lihat backends.py)
+    progress(0.3, "Melatih model")
+    model = make_model(params)
+    model.fit(X_resampled_scaled, y_resampled)
+
+    # 5. Evaluasi pada data asli
+    progress(0.85, "Evaluasi")
+    y_pred = model.predict(scaler.transform(X))
+    report = {
+        "accuracy": accuracy_score(y, y_pred),
+        "classification_report": classification_report(y, y_pred, target_names=label_encoder.classes_),
+    }
+
+    # 6. Ekspor scorer terkompilasi, hanya dipakai jika hasilnya identik dengan model
+    progress(0.95, "Kompilasi scorer")
+    scorer = compile_model(model, scaler)
+    if scorer is not None:
+        problems = check_parity(scorer, model, scaler, X)
+        if problems:
+            print("Scorer terkompilasi tidak dipakai:", "; ".join(problems))
+            scorer = None
+
+    # 7. Tabel bobot per kelas untuk penjelasan prediksi (model linear saja)
+    explainer = build_explainer(model, scaler, X, used_columns, label_encoder.classes_)
+
+    metadata = {
+        "version": version,
+        "source": source,
+        "params": dict(params),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "pipeline_version": PIPELINE_VERSION,
+        "sklearn_version": sklearn_version(),
+        "n_samples": len(X),
+        "accuracy": report["accuracy"],
+        "compiled_scorer": scorer is not None,
+        "explainer": explainer is not None,
+    }
+    bundle = ModelBundle(model, label_encoder, scaler, used_columns, metadata, scorer, explainer)
+    return bundle, report
+
+
+def train_bytes(data, params=HYPERPARAMS, source=None, on_progress=None):
+    # Workbook di-parse dan di-encode sekali; training berikutnya memakai cache kolomnar (ingest.py)
+    X, labels, used_columns = ingest.load_encoded(data)
+    return train_encoded(X, labels, used_columns, params, version=fingerprint(data, params), source=source,
+                         on_progress=on_progress)
+
+
+def ensure_bundle(store, path=TRAINING_FILE, params=HYPERPARAMS):
+    # Latih ulang hanya jika belum ada bundle untuk fingerprint workbook ini.
+    # Bundle baru langsung dipublikasikan; jika sudah ada, versi aktif tidak diubah.
+    with open(path, "rb") as f:
+        data = f.read()
+    version = fingerprint(data, params)
+    if not store.has_version(version):
+        bundle, report = train_bytes(data, params, source=path)
+        store.publish(bundle)
+        print("Akurasi:", report["accuracy"])
+        print(report["classification_report"])
+    elif store.current_version() is None:
+        store.publish(store.load(version))
+    return version
+
+
+def train_with_search(store, path=TRAINING_FILE, params=HYPERPARAMS, n_folds=5, time_budget=None, n_jobs=None):
+    # Mode pencarian: pilih hyperparameter terbaik dengan k-fold, lalu latih dan publikasikan bundle final
+    import search
+
+    # Kandidat dilatih dengan backend yang sama dengan model final, agar akurasi CV berlaku untuknya
+    grid = search.grid_for(params.get("backend", HYPERPARAMS["backend"]))
+    board = search.run_search(*search.load_training_data(path), grid=grid, n_folds=n_folds,
+                              time_budget=time_budget, n_jobs=n_jobs, random_state=params.get("random_state"))
+    print(board.head(10).to_string())
+    print("Leaderboard disimpan di", search.save_leaderboard(board))
+
+    best = search.best_params(board)
+    if best is None:
+        raise RuntimeError("Tidak ada kandidat yang selesai semua fold-nya dalam batas waktu")
+    best_params, cv_accuracy = best
+    params = dict(params, **best_params)
+    with open(path, "rb") as f:
+        bundle, report = train_bytes(f.read(), params, source=path)
+    bundle.metadata["cv_accuracy"] = cv_accuracy
+    store.publish(bundle)
+    print("Parameter terbaik:", best_params, "| akurasi CV:", cv_accuracy)
+    return bundle.version
+
+
+if __name__ == "__main__":
+    import search
+    from backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Training model deteksi hepatitis")
+    parser.add_argument("--search", action="store_true",
+                        help="cari hyperparameter terbaik dengan stratified k-fold sebelum training")
+    parser.add_argument("--backend", choices=BACKENDS, default=HYPERPARAMS["backend"],
+                        help="backend klasifikasi (lihat backends.py)")
+    search.add_arguments(parser)
+    args = parser.parse_args()
+
+    store = ModelStore()
+    params = dict(HYPERPARAMS, backend=args.backend)
+    if args.search:
+        version = train_with_search(store, params=params, n_folds=args.folds, time_budget=args.time_budget,
+                                    n_jobs=args.jobs)
+    else:
+        version = ensure_bundle(store, params=params)
+    print("Versi model:", version)